@@ -0,0 +1,205 @@
+"""Opt-in admission control and load shedding.
+
+Enabled with ``LANCER_RESERVES_ADMISSION_CONTROL=true``. Every HTTP request
+is assigned to a lane by method and path. A lane runs at most ``limit``
+requests at once, keeps at most ``queue`` more waiting, and gives up on a
+waiter after ``queue_timeout`` seconds. Requests that cannot be admitted get
+``503`` with a ``Retry-After`` header instead of piling up in the
+threadpool behind a saturated SQLite database.
+
+``/health``, ``/metrics``, ``/`` and single-reserve reads by id go through
+their own priority lane, so they keep answering while imports and large
+listings are backed up. GraphQL requests that call ``importReserves`` or
+``startImportJob`` share the bulk lane with the REST imports; other GraphQL
+requests have a lane of their own.
+"""
+import asyncio
+import re
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Tuple
+
+from starlette.responses import JSONResponse
+
+from backend.campaigns import route_path
+
+PRIORITY = "priority"
+READ = "read"
+WRITE = "write"
+BULK = "bulk"
+GRAPHQL = "graphql"
+
+LANES = (PRIORITY, READ, WRITE, BULK, GRAPHQL)
+
+PRIORITY_PATHS = frozenset({"/", "/health", "/metrics"})
+
+# Collection endpoints that would otherwise look like /reserves/{reserve_id}
+RESERVE_COLLECTION_PATHS = frozenset({"random", "changes", "batch", "import"})
+
+RESERVE_ITEM = re.compile(r"^/api/v1/reserves/([^/]+)/?$")
+
+# Searched in the raw request body rather than a parsed document, so a
+# large import is not decoded on the event loop just to classify it. A
+# match elsewhere (e.g. inside a description) only means a stricter lane.
+GRAPHQL_BULK_FIELDS = re.compile(rb"\b(?:importReserves|startImportJob)\b")
+
+
+class LaneFull(Exception):
+    """The lane's queue is full or the wait exceeded its deadline"""
+
+
+class Lane:
+    """Concurrency limit with a bounded FIFO queue of waiters"""
+
+    def __init__(self, name: str, limit: int, queue: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in the queue if needed; raises LaneFull"""
+        if self.limit <= 0:
+            return
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.queue:
+            self.rejected += 1
+            raise LaneFull(self.name)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._remove(waiter)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            self.rejected += 1
+            raise LaneFull(self.name) from None
+
+    def release(self) -> None:
+        """Hand the slot to the oldest live waiter, or free it"""
+        if self.limit <= 0:
+            return
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot moves to the waiter, so ``active`` stays the same
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _remove(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+def classify(method: str, path: str) -> str:
+    """Pick the admission lane for a request"""
+    if path in PRIORITY_PATHS:
+        return PRIORITY
+    if path.startswith("/graphql"):
+        return GRAPHQL
+    if not path.startswith("/api/"):
+        # Docs and OpenAPI schema
+        return READ
+
+    item = RESERVE_ITEM.match(path)
+    if item and item.group(1) in RESERVE_COLLECTION_PATHS:
+        item = None
+
+    if method in ("GET", "HEAD"):
+        return PRIORITY if item else READ
+    if path.rstrip("/").endswith("/import"):
+        return BULK
+    if path.rstrip("/").endswith("/batch"):
+        # POST /batch is a read with its ids in the body
+        return READ
+    return WRITE
+
+
+def classify_graphql(body: bytes) -> str:
+    """Pick the admission lane for a GraphQL request from its body"""
+    return BULK if GRAPHQL_BULK_FIELDS.search(body) else GRAPHQL
+
+
+async def buffer_body(receive) -> Tuple[bytes, Callable[[], Awaitable[dict]]]:
+    """Read the whole request body; returns it and a ``receive`` that replays it"""
+    messages = []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request" or not message.get("more_body", False):
+            break
+
+    async def replay():
+        return messages.pop(0) if messages else await receive()
+
+    return b"".join(message.get("body", b"") for message in messages), replay
+
+
+def build_lanes(settings) -> Dict[str, Lane]:
+    """Create one lane per route class from the application settings"""
+    return {
+        name: Lane(
+            name,
+            limit=getattr(settings, f"admission_{name}_limit"),
+            queue=getattr(settings, f"admission_{name}_queue"),
+            queue_timeout=settings.admission_queue_timeout,
+        )
+        for name in LANES
+    }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying per-lane concurrency limits"""
+
+    def __init__(self, app, lanes: Dict[str, Lane], retry_after: int = 1):
+        self.app = app
+        self.lanes = lanes
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        name = classify(scope["method"], route_path(scope))
+        if name == GRAPHQL and scope["method"] == "POST":
+            # Mutations can't be sent with GET, so only POST bodies are read
+            body, receive = await buffer_body(receive)
+            name = classify_graphql(body)
+        lane = self.lanes[name]
+        try:
+            await lane.acquire()
+        except LaneFull:
+            await self.reject(lane)(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
+
+    def reject(self, lane: Lane) -> JSONResponse:
+        return JSONResponse(
+            {"detail": f"Server is busy ({lane.name} requests), retry later"},
+            status_code=503,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
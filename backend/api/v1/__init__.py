@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from backend.api.v1 import reserves
+from backend.api.v1 import jobs, reserves
 
 api_router = APIRouter()
 api_router.include_router(reserves.router, prefix="/reserves", tags=["reserves"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 
 __all__ = ["api_router"]
 
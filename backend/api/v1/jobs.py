@@ -0,0 +1,35 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+
+from backend.database import current_campaign, get_db
+from backend.schemas.jobs import ImportJobResponse
+from backend.services.jobs import get_import_job, import_jobs
+
+router = APIRouter()
+
+
+@router.post("/import", response_model=ImportJobResponse, status_code=202)
+def start_import_job(
+    request: Request,
+    response: Response,
+    reserves_data: List[Dict[str, Any]] = Body(..., description="Reserves in the same shape as POST /reserves/import"),
+    db: Session = Depends(get_db),
+):
+    """Queue a bulk import and return the job straight away.
+
+    Records are validated by the job, so invalid ones are reported on the
+    job instead of rejecting the whole request.
+    """
+    job = import_jobs.submit(db, reserves_data, current_campaign.get())
+    response.headers["Location"] = str(request.url_for("read_import_job", job_id=job.id))
+    return job
+
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+def read_import_job(job_id: str, db: Session = Depends(get_db)):
+    """Get the status and progress of an import job"""
+    job = get_import_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Import job '{job_id}' not found")
+    return job
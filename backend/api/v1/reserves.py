@@ -1,173 +1,277 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File
+from pydantic import TypeAdapter
+from pydantic_core import to_json
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 import json
 import random
 
 from backend.database import get_db
 from backend.models.reserves import Reserve
-from backend.schemas.reserves import ReserveCreate, ReserveUpdate, ReserveResponse, ReserveType
+from backend.schemas.reserves import (
+    DESCRIPTION_FORMS,
+    ReserveRecord,
+    ReservePatch,
+    ReserveResponse,
+    ReserveChanges,
+    ReserveBatchRequest,
+    ReserveBatchResponse,
+    ReserveType,
+)
+from backend.services import filters, reserves as reserve_service
+from backend.services.changes import get_changes_since
+from backend.services.reserves import BaseReserveReadOnlyError, ReserveExistsError, ReserveNotFoundError
+from backend.singleflight import read_key, reads
 
 router = APIRouter()
 
+RESPONSE_FIELDS = (*ReserveResponse.model_fields, *DESCRIPTION_FORMS)
 
-@router.post("/", response_model=ReserveResponse, status_code=201)
-def create_reserve(reserve: ReserveCreate, db: Session = Depends(get_db)):
-    """Create a new reserve"""
-    # Check if reserve with this ID already exists
-    existing_reserve = db.query(Reserve).filter(Reserve.id == reserve.id).first()
-    if existing_reserve:
-        raise HTTPException(status_code=400, detail=f"Reserve with id '{reserve.id}' already exists")
-    
-    db_reserve = Reserve(
-        id=reserve.id,
-        name=reserve.name,
-        type=reserve.type.value,
-        label=reserve.label,
-        description=reserve.description,
-        bonuses=[b.model_dump() for b in reserve.bonuses] if reserve.bonuses else None,
-        deployables=[d.model_dump() for d in reserve.deployables] if reserve.deployables else None,
-        actions=[a.model_dump() for a in reserve.actions] if reserve.actions else None,
-        synergies=[s.model_dump() for s in reserve.synergies] if reserve.synergies else None,
+MAX_BATCH_IDS = 1000
+# Stay well under SQLite's bound-parameter limit for IN lists
+BATCH_QUERY_CHUNK = 500
+
+
+def get_fields(
+    fields: Optional[str] = Query(
+        None,
+        description=(
+            "Comma-separated fields to return, e.g. 'id,name,type,label' (default: all fields "
+            "except description_text and description_html, which are only returned when listed)"
+        ),
     )
+) -> Optional[List[str]]:
+    """Parse and validate a sparse fieldset parameter"""
+    if not fields:
+        return None
     
-    db.add(db_reserve)
-    db.commit()
-    db.refresh(db_reserve)
-    return db_reserve
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in RESPONSE_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(RESPONSE_FIELDS)}",
+        )
+    return requested or None
+
+
+def reserve_query(db: Session, fields: Optional[List[str]], include_id: bool = False):
+    """Query full reserves, or only the requested columns for a sparse fieldset"""
+    if fields is None:
+        return db.query(Reserve)
+    columns = list(fields)
+    if include_id and "id" not in columns:
+        columns.append("id")
+    return db.query(*(getattr(Reserve, f) for f in columns))
+
+
+reserve_adapter = TypeAdapter(ReserveResponse)
+reserve_list_adapter = TypeAdapter(List[ReserveResponse])
+changes_adapter = TypeAdapter(ReserveChanges)
+batch_adapter = TypeAdapter(ReserveBatchResponse)
+
+
+def render(adapter: TypeAdapter, result) -> bytes:
+    """Serialize ORM results to JSON through a response schema"""
+    return adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+
+
+def render_reserves(result, fields: Optional[List[str]]) -> bytes:
+    """Serialize a reserve or list of reserves, keeping only ``fields`` if given"""
+    if fields is None:
+        return render(reserve_list_adapter if isinstance(result, list) else reserve_adapter, result)
+    if isinstance(result, list):
+        return to_json([{f: getattr(row, f) for f in fields} for row in result])
+    return to_json({f: getattr(result, f) for f in fields})
+
+
+async def coalesced(db: Session, key, produce) -> Response:
+    """Serve identical concurrent reads from one query and one serialization.
+
+    ``produce`` must return the JSON body and runs in the threadpool;
+    requests for the same database with the same ``key`` that arrive while
+    it runs, and after its last committed write, await its result on the
+    event loop. Endpoints using this are ``async`` for that reason.
+    """
+    return Response(content=await reads.do(read_key(db, key), produce), media_type="application/json")
+
+
+@router.post("/", response_model=ReserveResponse, status_code=201)
+def create_reserve(reserve: ReserveRecord, db: Session = Depends(get_db)):
+    """Create a new reserve"""
+    try:
+        return reserve_service.create_reserve(db, reserve)
+    except ReserveExistsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/", response_model=List[ReserveResponse])
-def list_reserves(
+async def list_reserves(
     type: Optional[ReserveType] = Query(None, description="Filter by reserve type"),
     label: Optional[str] = Query(None, description="Filter by label"),
+    label_prefix: Optional[str] = Query(None, description="Filter by label prefix (case-insensitive)"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    fields: Optional[List[str]] = Depends(get_fields),
     db: Session = Depends(get_db)
 ):
     """List all reserves with optional filtering and pagination"""
-    query = db.query(Reserve)
-    
-    if type:
-        query = query.filter(Reserve.type == type.value)
-    
-    if label:
-        query = query.filter(func.lower(Reserve.label).contains(label.lower()))
+    def produce():
+        query = reserve_query(db, fields)
+        
+        if type:
+            query = query.filter(Reserve.type == type.value)
+        
+        if label:
+            query = query.filter(filters.label_contains(label))
+        
+        if label_prefix:
+            query = query.filter(filters.label_prefix(label_prefix))
+        
+        return render_reserves(query.order_by(Reserve.id).offset(skip).limit(limit).all(), fields)
     
-    reserves = query.offset(skip).limit(limit).all()
-    return reserves
+    key = ("list", type, label, label_prefix, skip, limit, fields and tuple(fields))
+    return await coalesced(db, key, produce)
 
 
 @router.get("/type/{reserve_type}", response_model=List[ReserveResponse])
-def get_reserves_by_type(
+async def get_reserves_by_type(
     reserve_type: ReserveType,
+    fields: Optional[List[str]] = Depends(get_fields),
     db: Session = Depends(get_db)
 ):
     """Get all reserves of a specific type"""
-    reserves = db.query(Reserve).filter(Reserve.type == reserve_type.value).all()
-    return reserves
+    def produce():
+        reserves = reserve_query(db, fields).filter(Reserve.type == reserve_type.value).order_by(Reserve.id).all()
+        return render_reserves(reserves, fields)
+    
+    return await coalesced(db, ("type", reserve_type, fields and tuple(fields)), produce)
 
 
 @router.get("/random", response_model=List[ReserveResponse])
 def get_random_reserves(
     count: int = Query(1, ge=1, le=50, description="Number of random reserves to return"),
     type: Optional[ReserveType] = Query(None, description="Filter by reserve type before random selection"),
+    fields: Optional[List[str]] = Depends(get_fields),
     db: Session = Depends(get_db)
 ):
     """Get random reserves with optional type filtering"""
-    query = db.query(Reserve)
+    # Sample from ids only, then load just the selected rows
+    query = db.query(Reserve.id)
     
     if type:
         query = query.filter(Reserve.type == type.value)
     
-    all_reserves = query.all()
+    all_ids = [row.id for row in query]
     
-    if not all_reserves:
+    if not all_ids:
         raise HTTPException(status_code=404, detail="No reserves found matching the criteria")
     
     # Select random reserves without replacement
-    selected_count = min(count, len(all_reserves))
-    random_reserves = random.sample(all_reserves, selected_count)
+    selected_count = min(count, len(all_ids))
+    selected_ids = random.sample(all_ids, selected_count)
     
-    return random_reserves
+    by_id = {r.id: r for r in reserve_query(db, fields, include_id=True).filter(Reserve.id.in_(selected_ids))}
+    random_reserves = [by_id[reserve_id] for reserve_id in selected_ids if reserve_id in by_id]
+    
+    # Random picks are per request, so they are never coalesced
+    return Response(content=render_reserves(random_reserves, fields), media_type="application/json")
+
+
+@router.get("/changes", response_model=ReserveChanges)
+async def get_reserve_changes(
+    since: int = Query(0, ge=0, description="Change token from a previous sync (0 for a full sync)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum number of change-log entries to consume"),
+    db: Session = Depends(get_db)
+):
+    """Get reserves created, updated or deleted since a change token"""
+    def produce():
+        token, upserts, deleted, has_more = get_changes_since(db, since, limit)
+        return render(changes_adapter, {"token": token, "upserts": upserts, "deleted": deleted, "has_more": has_more})
+    
+    # Clients polling from the same token share one query
+    return await coalesced(db, ("changes", since, limit), produce)
+
+
+async def fetch_batch(db: Session, ids: List[str]) -> Response:
+    """Resolve many ids with IN queries, preserving request order"""
+    unique_ids = list(dict.fromkeys(ids))
+    if len(unique_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids can be fetched per request")
+    
+    return await coalesced(db, ("batch", tuple(unique_ids)), lambda: render(batch_adapter, load_batch(db, unique_ids)))
+
+
+def load_batch(db: Session, unique_ids: List[str]) -> dict:
+    by_id = {}
+    for start in range(0, len(unique_ids), BATCH_QUERY_CHUNK):
+        chunk = unique_ids[start:start + BATCH_QUERY_CHUNK]
+        by_id.update((r.id, r) for r in db.query(Reserve).filter(Reserve.id.in_(chunk)))
+    
+    return {
+        "reserves": [by_id[reserve_id] for reserve_id in unique_ids if reserve_id in by_id],
+        "missing": [reserve_id for reserve_id in unique_ids if reserve_id not in by_id],
+    }
+
+
+@router.get("/batch", response_model=ReserveBatchResponse)
+async def get_reserves_batch(
+    ids: List[str] = Query(..., description="Reserve IDs to fetch, repeated or comma-separated (max 1000)"),
+    db: Session = Depends(get_db)
+):
+    """Get many reserves by ID in one request"""
+    requested = [reserve_id for value in ids for reserve_id in value.split(",") if reserve_id]
+    if not requested:
+        raise HTTPException(status_code=400, detail="No reserve ids given")
+    return await fetch_batch(db, requested)
+
+
+@router.post("/batch", response_model=ReserveBatchResponse)
+async def post_reserves_batch(batch: ReserveBatchRequest, db: Session = Depends(get_db)):
+    """Get many reserves by ID, for lists too long for a query string"""
+    return await fetch_batch(db, batch.ids)
 
 
 @router.get("/{reserve_id}", response_model=ReserveResponse)
-def get_reserve(reserve_id: str, db: Session = Depends(get_db)):
+async def get_reserve(
+    reserve_id: str,
+    fields: Optional[List[str]] = Depends(get_fields),
+    db: Session = Depends(get_db)
+):
     """Get a specific reserve by ID"""
-    reserve = db.query(Reserve).filter(Reserve.id == reserve_id).first()
-    if not reserve:
-        raise HTTPException(status_code=404, detail=f"Reserve with id '{reserve_id}' not found")
-    return reserve
+    def produce():
+        reserve = reserve_query(db, fields).filter(Reserve.id == reserve_id).first()
+        if not reserve:
+            raise HTTPException(status_code=404, detail=f"Reserve with id '{reserve_id}' not found")
+        return render_reserves(reserve, fields)
+    
+    return await coalesced(db, ("get", reserve_id, fields and tuple(fields)), produce)
 
 
 @router.put("/{reserve_id}", response_model=ReserveResponse)
-def update_reserve(reserve_id: str, reserve_update: ReserveUpdate, db: Session = Depends(get_db)):
+def update_reserve(reserve_id: str, reserve_update: ReservePatch, db: Session = Depends(get_db)):
     """Update a reserve"""
-    db_reserve = db.query(Reserve).filter(Reserve.id == reserve_id).first()
-    if not db_reserve:
-        raise HTTPException(status_code=404, detail=f"Reserve with id '{reserve_id}' not found")
-    
-    # Update only provided fields
-    update_data = reserve_update.model_dump(exclude_unset=True)
-    
-    for field, value in update_data.items():
-        if field in ["bonuses", "deployables", "actions", "synergies"] and value is not None:
-            # Convert Pydantic models to dicts for JSON storage
-            setattr(db_reserve, field, [item.model_dump() if hasattr(item, 'model_dump') else item for item in value])
-        elif field == "type" and value is not None:
-            setattr(db_reserve, field, value.value)
-        else:
-            setattr(db_reserve, field, value)
-    
-    db.commit()
-    db.refresh(db_reserve)
-    return db_reserve
+    try:
+        return reserve_service.update_reserve(db, reserve_id, reserve_update)
+    except ReserveNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BaseReserveReadOnlyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 
 @router.delete("/{reserve_id}", status_code=204)
 def delete_reserve(reserve_id: str, db: Session = Depends(get_db)):
     """Delete a reserve"""
-    db_reserve = db.query(Reserve).filter(Reserve.id == reserve_id).first()
-    if not db_reserve:
-        raise HTTPException(status_code=404, detail=f"Reserve with id '{reserve_id}' not found")
-    
-    db.delete(db_reserve)
-    db.commit()
+    try:
+        reserve_service.delete_reserve(db, reserve_id)
+    except ReserveNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BaseReserveReadOnlyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     return None
 
 
 @router.post("/import", response_model=List[ReserveResponse])
-def import_reserves(reserves_data: List[ReserveCreate], db: Session = Depends(get_db)):
-    """Bulk import reserves from JSON data"""
-    imported_reserves = []
-    
-    for reserve_data in reserves_data:
-        # Check if reserve already exists
-        existing_reserve = db.query(Reserve).filter(Reserve.id == reserve_data.id).first()
-        if existing_reserve:
-            continue  # Skip existing reserves
-        
-        db_reserve = Reserve(
-            id=reserve_data.id,
-            name=reserve_data.name,
-            type=reserve_data.type.value,
-            label=reserve_data.label,
-            description=reserve_data.description,
-            bonuses=[b.model_dump() for b in reserve_data.bonuses] if reserve_data.bonuses else None,
-            deployables=[d.model_dump() for d in reserve_data.deployables] if reserve_data.deployables else None,
-            actions=[a.model_dump() for a in reserve_data.actions] if reserve_data.actions else None,
-            synergies=[s.model_dump() for s in reserve_data.synergies] if reserve_data.synergies else None,
-        )
-        
-        db.add(db_reserve)
-        imported_reserves.append(db_reserve)
-    
-    db.commit()
-    
-    for reserve in imported_reserves:
-        db.refresh(reserve)
-    
-    return imported_reserves
-
+def import_reserves(reserves_data: List[ReserveRecord], db: Session = Depends(get_db)):
+    """Bulk import reserves from JSON data, skipping ids that already exist"""
+    return reserve_service.import_reserves(db, reserves_data)
@@ -0,0 +1,59 @@
+"""Routing requests to campaign catalogs.
+
+A request is served from a campaign's shard when its path starts with
+``/campaigns/{campaign}`` (``/campaigns/ashfall/api/v1/reserves/...``,
+``/campaigns/ashfall/graphql``) or when it carries an ``X-Campaign``
+header. Otherwise it is served from the base catalog. The prefix is
+treated like a mount point (added to ``root_path``), so the same REST and
+GraphQL routes serve every catalog.
+"""
+from starlette.responses import JSONResponse
+
+from backend.database import CAMPAIGN_NAME, current_campaign
+
+PATH_PREFIX = "/campaigns/"
+HEADER = b"x-campaign"
+
+
+def route_path(scope) -> str:
+    """The request path without the application's root path (and campaign prefix)"""
+    path, root_path = scope["path"], scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        return path[len(root_path):] or "/"
+    return path
+
+
+class CampaignMiddleware:
+    """ASGI middleware selecting the campaign catalog for each request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        campaign = None
+        path = route_path(scope)
+        if path.startswith(PATH_PREFIX):
+            campaign = path[len(PATH_PREFIX):].partition("/")[0]
+            # Routing strips root_path, like a mount. Mutated in place so outer
+            # middleware sees the matched route too.
+            scope["root_path"] = scope.get("root_path", "") + PATH_PREFIX + campaign
+        else:
+            for name, value in scope["headers"]:
+                if name == HEADER:
+                    campaign = value.decode("latin-1").strip()
+                    break
+
+        if campaign is not None and not CAMPAIGN_NAME.match(campaign):
+            response = JSONResponse({"detail": f"Invalid campaign '{campaign}'"}, status_code=400)
+            await response(scope, receive, send)
+            return
+
+        token = current_campaign.set(campaign or None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_campaign.reset(token)
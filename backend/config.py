@@ -0,0 +1,55 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Application settings, overridable via LANCER_RESERVES_* environment variables"""
+
+    model_config = SettingsConfigDict(env_prefix="LANCER_RESERVES_", env_file=".env", extra="ignore")
+
+    database_url: str = "sqlite:///./lancer_reserves.db"
+
+    # Campaign catalogs: one SQLite shard per campaign in this directory,
+    # with at most this many shard engines open at once
+    campaigns_dir: str = "./campaigns"
+    max_open_campaigns: int = 32
+
+    # Serve GraphQL at /graphql and the OpenAPI docs at /docs and /redoc.
+    # Turning both off gives a lighter REST-only app (e.g. read replicas).
+    graphql: bool = True
+    docs: bool = True
+
+    # Server-Timing headers, SQL/resolver timing and the /metrics endpoint
+    instrumentation: bool = False
+
+    # Share one query and serialization between identical concurrent reads
+    read_coalescing: bool = True
+
+    # Group-commit single-reserve writes: concurrent creates/updates/deletes
+    # arriving within the window share one transaction
+    write_batching: bool = False
+    write_batch_window_ms: float = 2.0
+    write_batch_max_size: int = 256
+
+    # Background import jobs: records per batch, and processes used for
+    # validation (0 validates in the job thread)
+    import_job_batch_size: int = 500
+    import_job_workers: int = 0
+
+    # Per-route-class concurrency limits with bounded queues (see backend/admission.py).
+    # A limit of 0 disables the limit for that lane.
+    admission_control: bool = False
+    admission_queue_timeout: float = 2.0
+    admission_retry_after: int = 1
+    admission_priority_limit: int = 8
+    admission_priority_queue: int = 64
+    admission_read_limit: int = 16
+    admission_read_queue: int = 64
+    admission_write_limit: int = 4
+    admission_write_queue: int = 32
+    admission_bulk_limit: int = 1
+    admission_bulk_queue: int = 2
+    admission_graphql_limit: int = 8
+    admission_graphql_queue: int = 32
+
+
+settings = Settings()
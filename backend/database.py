@@ -1,28 +1,188 @@
-from sqlalchemy import create_engine
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.config import settings
+
+SQLALCHEMY_DATABASE_URL = settings.database_url
+
+# Writes use INSERT ... ON CONFLICT / UPDATE ... / DELETE ... RETURNING
+MIN_SQLITE_VERSION = (3, 35, 0)
+
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./lancer_reserves.db"
+def check_sqlite_version(version=sqlite3.sqlite_version_info) -> None:
+    """Fail early if Python's SQLite library is too old for the write path"""
+    if version < MIN_SQLITE_VERSION:
+        raise RuntimeError(
+            f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is required (RETURNING clauses); "
+            f"this Python uses SQLite {'.'.join(map(str, version))}. Use a newer Python build or one linked "
+            "against a newer SQLite library."
+        )
 
+
+check_sqlite_version()
+
+# The base catalog, seeded from reserves.json
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Writes return their rows via RETURNING, so don't expire them on commit.
+# Sessions for campaign shards come from the same factory with bind=...
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
+# Campaign of the current request (None for the base catalog). Set by
+# CampaignMiddleware and copied into threadpool workers with the context.
+current_campaign: ContextVar[Optional[str]] = ContextVar("campaign", default=None)
+
+CAMPAIGN_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+
+# Campaign shards attach the base catalog under this schema name. Only a
+# file database can be attached, so an in-memory base is not shared.
+BASE_SCHEMA = "base"
+_base_path = make_url(SQLALCHEMY_DATABASE_URL).database
+BASE_CATALOG_PATH = _base_path if _base_path and _base_path != ":memory:" else None
+
+# Reserve writes name the table explicitly: in campaign shards the bare
+# name ``reserves`` is a read-only view that also includes base reserves.
+WRITE_TABLES = {"schema_translate_map": {None: "main"}}
+
+
+class InvalidCampaignError(ValueError):
+    """Raised for campaign names that can't be used as a shard file name"""
+
+    def __init__(self, campaign: str):
+        super().__init__(f"Invalid campaign '{campaign}': use lowercase letters, digits, '-' and '_' (max 63)")
+        self.campaign = campaign
+
+
+def _attach_base_catalog(base_path: str):
+    """Connect hook exposing base reserves inside a campaign shard.
+
+    The base catalog is attached read-only and a per-connection TEMP view
+    named ``reserves`` (which shadows the shard's own table for unqualified
+    reads) returns the campaign's reserves plus every base reserve whose id
+    the campaign has not overridden. Base reserves are therefore stored once,
+    not copied into every shard.
+    """
+    uri = Path(base_path).resolve().as_uri() + "?mode=ro"
+
+    def on_connect(dbapi_connection, connection_record):
+        columns = ", ".join(c.name for c in Base.metadata.tables["reserves"].columns)
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"ATTACH DATABASE ? AS {BASE_SCHEMA}", (uri,))
+        cursor.execute(
+            f"CREATE TEMP VIEW reserves AS "
+            f"SELECT {columns} FROM main.reserves "
+            f"UNION ALL "
+            f"SELECT {columns} FROM {BASE_SCHEMA}.reserves WHERE id NOT IN (SELECT id FROM main.reserves)"
+        )
+        cursor.close()
+
+    return on_connect
+
+
+class EngineRegistry:
+    """Engines for the base catalog and campaign shards.
+
+    Each campaign has its own SQLite file under ``directory``, created and
+    migrated on first use. At most ``max_open`` shard engines are kept open;
+    the least recently used one is disposed when another is needed. The base
+    catalog's engine is never evicted.
+    """
+
+    def __init__(self, base: Engine, directory: str, max_open: int):
+        self.base = base
+        self.directory = Path(directory)
+        self.max_open = max_open
+        self._engines: "OrderedDict[str, Engine]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, campaign: Optional[str] = None) -> Engine:
+        """Engine for a campaign's shard, or the base catalog for None"""
+        if campaign is None:
+            return self.base
+        with self._lock:
+            shard = self._engines.get(campaign)
+            if shard is not None:
+                self._engines.move_to_end(campaign)
+                return shard
+
+            shard = self._open(campaign)
+            self._engines[campaign] = shard
+            while len(self._engines) > self.max_open:
+                _, evicted = self._engines.popitem(last=False)
+                # Checked-out connections stay usable and close on return
+                evicted.dispose()
+            return shard
+
+    def campaigns(self) -> List[str]:
+        """Campaigns that have a shard on disk"""
+        return sorted(path.stem for path in self.directory.glob("*.db") if CAMPAIGN_NAME.match(path.stem))
+
+    def _open(self, campaign: str) -> Engine:
+        if not CAMPAIGN_NAME.match(campaign):
+            raise InvalidCampaignError(campaign)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        url = f"sqlite:///{self.directory / campaign}.db"
+
+        # Create and migrate the shard without the base view, which would
+        # otherwise hide whether the shard's own reserves table exists
+        setup = create_engine(url)
+        try:
+            init_db(setup)
+        finally:
+            setup.dispose()
+
+        # uri=True so ATTACH reads the base catalog's "file:...?mode=ro" URI as
+        # one; otherwise SQLite builds without SQLITE_USE_URI create an empty
+        # database with that literal name
+        shard = create_engine(url, connect_args={"check_same_thread": False, "uri": True})
+        if BASE_CATALOG_PATH is not None:
+            event.listen(shard, "connect", _attach_base_catalog(BASE_CATALOG_PATH))
+        return shard
+
+
+engines = EngineRegistry(engine, settings.campaigns_dir, settings.max_open_campaigns)
+
+
+def attaches_base_catalog(bind: Engine) -> bool:
+    """Whether ``bind`` is a campaign shard that also sees the base catalog"""
+    return bind is not engine and BASE_CATALOG_PATH is not None
+
+
+def open_session(campaign: Optional[str] = None) -> Session:
+    """Session on a campaign's shard, or on the base catalog for None"""
+    return SessionLocal(bind=engines.get(campaign))
+
 
 def get_db():
-    """Dependency for getting database sessions"""
-    db = SessionLocal()
+    """Dependency for getting database sessions for the request's campaign"""
+    db = open_session(current_campaign.get())
     try:
         yield db
     finally:
         db.close()
 
 
-def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
-
+def init_db(bind: Engine = engine):
+    """Initialize database tables and apply pending migrations"""
+    from backend.migrations import run_migrations, stamp_latest
 
+    fresh = not inspect(bind).has_table("reserves")
+    Base.metadata.create_all(bind=bind)
+    if fresh:
+        stamp_latest(bind)
+    else:
+        for description in run_migrations(bind):
+            print(f"Applied migration: {description}")
@@ -0,0 +1,42 @@
+"""Schema that executes large GraphQL requests off the event loop.
+
+Before any resolver runs, Strawberry parses and validates the document and
+coerces the arguments into input objects, all on the event loop, and it
+completes the result there afterwards. For an ``importReserves`` call with
+thousands of reserves that takes seconds, during which no other request
+(``/health`` included) is served, so admission control can't help.
+
+Large requests are therefore executed on an event loop of their own in a
+threadpool worker. Small requests stay on the main loop, where they don't
+pay for the extra thread and loop.
+"""
+import asyncio
+from typing import Any, Dict, Optional
+
+import strawberry
+from starlette.concurrency import run_in_threadpool
+from strawberry.types import ExecutionResult
+
+# Documents with at least this many characters, or variables holding a list
+# with at least this many items, are executed in the threadpool
+THREADPOOL_DOCUMENT_SIZE = 10_000
+THREADPOOL_LIST_SIZE = 100
+
+
+def is_large_request(query: Optional[str], variables: Optional[Dict[str, Any]]) -> bool:
+    if query is not None and len(query) >= THREADPOOL_DOCUMENT_SIZE:
+        return True
+    return any(isinstance(value, list) and len(value) >= THREADPOOL_LIST_SIZE for value in (variables or {}).values())
+
+
+class Schema(strawberry.Schema):
+    """Strawberry schema running large requests on a worker thread's own loop"""
+
+    async def execute(self, query: Optional[str], variable_values: Optional[Dict[str, Any]] = None, **kwargs: Any) -> ExecutionResult:
+        execute = super().execute
+        if not is_large_request(query, variable_values):
+            return await execute(query, variable_values, **kwargs)
+
+        # run_in_threadpool copies the request's context (campaign,
+        # instrumentation) into the worker, and asyncio.run into its loop
+        return await run_in_threadpool(asyncio.run, execute(query, variable_values, **kwargs))
@@ -0,0 +1,30 @@
+"""Resolver timing for ``backend.instrumentation`` (GraphQL apps only)"""
+import inspect
+import time
+
+from strawberry.extensions import SchemaExtension
+
+from backend.instrumentation import record_resolver
+
+ROOT_TYPES = ("Query", "Mutation")
+
+
+class ResolverTimingExtension(SchemaExtension):
+    """Strawberry extension timing root Query/Mutation resolvers"""
+
+    def resolve(self, _next, root, info, *args, **kwargs):
+        if info.parent_type.name not in ROOT_TYPES:
+            return _next(root, info, *args, **kwargs)
+
+        started = time.perf_counter()
+        result = _next(root, info, *args, **kwargs)
+        if inspect.isawaitable(result):
+            return self._finish_async(result, info.field_name, started)
+        record_resolver(info.field_name, time.perf_counter() - started)
+        return result
+
+    async def _finish_async(self, result, field: str, started: float):
+        try:
+            return await result
+        finally:
+            record_resolver(field, time.perf_counter() - started)
@@ -1,212 +1,84 @@
-from typing import List
+from dataclasses import asdict
+from typing import List, Union
 import strawberry
 from strawberry.types import Info
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from backend.models.reserves import Reserve
-from backend.graphql.schema import ReserveType, ReserveInput, ReserveUpdateInput
-from backend.graphql.queries import convert_reserve_to_graphql
+from backend.graphql.schema import ImportJobType, ReserveType, ReserveInput, ReserveUpdateInput
+from backend.graphql.queries import convert_import_job_to_graphql, convert_reserve_to_graphql
+from backend.services import reserves as reserve_service
+from backend.services.jobs import import_jobs
+
+
+def input_to_record(input: Union[ReserveInput, ReserveUpdateInput]) -> dict:
+    """Convert a GraphQL reserve input into a storage record.
+
+    Fields left as None are treated as not provided and dropped.
+    """
+    record = {field: value for field, value in asdict(input).items() if value is not None}
+    if "type" in record:
+        record["type"] = record["type"].value
+    if "actions" in record:
+        record["actions"] = [
+            {field: value for field, value in action.items() if value is not None}
+            for action in record["actions"]
+        ]
+    return record
 
 
 @strawberry.type
 class Mutation:
+    # Resolvers do their work in the threadpool: on the event loop, a write
+    # waiting for its group commit (see backend/services/batching.py) would
+    # block every other request. Mutations run one after another, so the
+    # request's session can be used from the threadpool.
+    
     @strawberry.mutation
-    def create_reserve(self, info: Info, input: ReserveInput) -> ReserveType:
+    async def create_reserve(self, info: Info, input: ReserveInput) -> ReserveType:
         """Create a new reserve"""
         db: Session = info.context["db"]
         
-        # Check if reserve already exists
-        existing = db.query(Reserve).filter(Reserve.id == input.id).first()
-        if existing:
-            raise Exception(f"Reserve with id '{input.id}' already exists")
-        
-        # Convert input to dict for JSON fields
-        bonuses_data = None
-        if input.bonuses:
-            bonuses_data = [{"id": b.id, "val": b.val} for b in input.bonuses]
-        
-        deployables_data = None
-        if input.deployables:
-            deployables_data = [
-                {"name": d.name, "type": d.type, "size": d.size, "detail": d.detail}
-                for d in input.deployables
-            ]
+        def run():
+            return convert_reserve_to_graphql(reserve_service.create_reserve(db, input_to_record(input)))
         
-        actions_data = None
-        if input.actions:
-            actions_data = []
-            for a in input.actions:
-                action_dict = {
-                    "name": a.name,
-                    "activation": a.activation,
-                    "detail": a.detail,
-                }
-                if a.range:
-                    action_dict["range"] = [{"type": r.type, "val": r.val} for r in a.range]
-                if a.damage:
-                    action_dict["damage"] = [{"type": d.type, "val": d.val} for d in a.damage]
-                actions_data.append(action_dict)
-        
-        synergies_data = None
-        if input.synergies:
-            synergies_data = [
-                {"locations": s.locations, "detail": s.detail}
-                for s in input.synergies
-            ]
-        
-        # Create reserve
-        db_reserve = Reserve(
-            id=input.id,
-            name=input.name,
-            type=input.type.value,
-            label=input.label,
-            description=input.description,
-            bonuses=bonuses_data,
-            deployables=deployables_data,
-            actions=actions_data,
-            synergies=synergies_data,
-        )
-        
-        db.add(db_reserve)
-        db.commit()
-        db.refresh(db_reserve)
-        
-        return convert_reserve_to_graphql(db_reserve)
+        return await run_in_threadpool(run)
     
     @strawberry.mutation
-    def update_reserve(self, info: Info, id: str, input: ReserveUpdateInput) -> ReserveType:
+    async def update_reserve(self, info: Info, id: str, input: ReserveUpdateInput) -> ReserveType:
         """Update an existing reserve"""
         db: Session = info.context["db"]
         
-        db_reserve = db.query(Reserve).filter(Reserve.id == id).first()
-        if not db_reserve:
-            raise Exception(f"Reserve with id '{id}' not found")
-        
-        # Update fields if provided
-        if input.name is not None:
-            db_reserve.name = input.name
-        if input.type is not None:
-            db_reserve.type = input.type.value
-        if input.label is not None:
-            db_reserve.label = input.label
-        if input.description is not None:
-            db_reserve.description = input.description
-        
-        if input.bonuses is not None:
-            db_reserve.bonuses = [{"id": b.id, "val": b.val} for b in input.bonuses]
+        def run():
+            return convert_reserve_to_graphql(reserve_service.update_reserve(db, id, input_to_record(input)))
         
-        if input.deployables is not None:
-            db_reserve.deployables = [
-                {"name": d.name, "type": d.type, "size": d.size, "detail": d.detail}
-                for d in input.deployables
-            ]
-        
-        if input.actions is not None:
-            actions_data = []
-            for a in input.actions:
-                action_dict = {
-                    "name": a.name,
-                    "activation": a.activation,
-                    "detail": a.detail,
-                }
-                if a.range:
-                    action_dict["range"] = [{"type": r.type, "val": r.val} for r in a.range]
-                if a.damage:
-                    action_dict["damage"] = [{"type": d.type, "val": d.val} for d in a.damage]
-                actions_data.append(action_dict)
-            db_reserve.actions = actions_data
-        
-        if input.synergies is not None:
-            db_reserve.synergies = [
-                {"locations": s.locations, "detail": s.detail}
-                for s in input.synergies
-            ]
-        
-        db.commit()
-        db.refresh(db_reserve)
-        
-        return convert_reserve_to_graphql(db_reserve)
+        return await run_in_threadpool(run)
     
     @strawberry.mutation
-    def delete_reserve(self, info: Info, id: str) -> bool:
+    async def delete_reserve(self, info: Info, id: str) -> bool:
         """Delete a reserve"""
         db: Session = info.context["db"]
-        
-        db_reserve = db.query(Reserve).filter(Reserve.id == id).first()
-        if not db_reserve:
-            raise Exception(f"Reserve with id '{id}' not found")
-        
-        db.delete(db_reserve)
-        db.commit()
-        
+        await run_in_threadpool(reserve_service.delete_reserve, db, id)
         return True
     
     @strawberry.mutation
-    def import_reserves(self, info: Info, reserves: List[ReserveInput]) -> List[ReserveType]:
-        """Bulk import reserves"""
+    async def import_reserves(self, info: Info, reserves: List[ReserveInput]) -> List[ReserveType]:
+        """Bulk import reserves, skipping ids that already exist"""
         db: Session = info.context["db"]
-        imported = []
         
-        for reserve_input in reserves:
-            # Skip if already exists
-            existing = db.query(Reserve).filter(Reserve.id == reserve_input.id).first()
-            if existing:
-                continue
-            
-            # Convert input to dict for JSON fields
-            bonuses_data = None
-            if reserve_input.bonuses:
-                bonuses_data = [{"id": b.id, "val": b.val} for b in reserve_input.bonuses]
-            
-            deployables_data = None
-            if reserve_input.deployables:
-                deployables_data = [
-                    {"name": d.name, "type": d.type, "size": d.size, "detail": d.detail}
-                    for d in reserve_input.deployables
-                ]
-            
-            actions_data = None
-            if reserve_input.actions:
-                actions_data = []
-                for a in reserve_input.actions:
-                    action_dict = {
-                        "name": a.name,
-                        "activation": a.activation,
-                        "detail": a.detail,
-                    }
-                    if a.range:
-                        action_dict["range"] = [{"type": r.type, "val": r.val} for r in a.range]
-                    if a.damage:
-                        action_dict["damage"] = [{"type": d.type, "val": d.val} for d in a.damage]
-                    actions_data.append(action_dict)
-            
-            synergies_data = None
-            if reserve_input.synergies:
-                synergies_data = [
-                    {"locations": s.locations, "detail": s.detail}
-                    for s in reserve_input.synergies
-                ]
-            
-            db_reserve = Reserve(
-                id=reserve_input.id,
-                name=reserve_input.name,
-                type=reserve_input.type.value,
-                label=reserve_input.label,
-                description=reserve_input.description,
-                bonuses=bonuses_data,
-                deployables=deployables_data,
-                actions=actions_data,
-                synergies=synergies_data,
-            )
-            
-            db.add(db_reserve)
-            imported.append(db_reserve)
+        def run():
+            imported = reserve_service.import_reserves(db, [input_to_record(r) for r in reserves])
+            return [convert_reserve_to_graphql(r) for r in imported]
         
-        db.commit()
+        return await run_in_threadpool(run)
+    
+    @strawberry.mutation
+    async def start_import_job(self, info: Info, reserves: List[ReserveInput]) -> ImportJobType:
+        """Queue a bulk import in the background and return the job"""
+        db: Session = info.context["db"]
         
-        for reserve in imported:
-            db.refresh(reserve)
+        def run():
+            job = import_jobs.submit(db, [input_to_record(r) for r in reserves], info.context["campaign"])
+            return convert_import_job_to_graphql(job)
         
-        return [convert_reserve_to_graphql(r) for r in imported]
-
-
+        return await run_in_threadpool(run)
@@ -2,11 +2,16 @@ from typing import List, Optional
 import strawberry
 from strawberry.types import Info
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from starlette.concurrency import run_in_threadpool
 import random
 
+from backend.models.jobs import ImportJob
 from backend.models.reserves import Reserve
-from backend.graphql.schema import ReserveType, ReserveTypeEnum, BonusType, DeployableType, ActionType, SynergyType, RangeValueType, DamageValueType
+from backend.services import filters
+from backend.services.changes import get_changes_since
+from backend.services.jobs import get_import_job
+from backend.singleflight import read_key, reads
+from backend.graphql.schema import ReserveType, ReserveChangesType, ReserveTypeEnum, ImportJobType, ImportJobErrorType, BonusType, DeployableType, ActionType, SynergyType, RangeValueType, DamageValueType
 
 
 def convert_reserve_to_graphql(db_reserve: Reserve) -> ReserveType:
@@ -45,6 +50,8 @@ def convert_reserve_to_graphql(db_reserve: Reserve) -> ReserveType:
         type=ReserveTypeEnum[db_reserve.type.upper()] if db_reserve.type.upper() in ReserveTypeEnum.__members__ else ReserveTypeEnum.BONUS,
         label=db_reserve.label,
         description=db_reserve.description,
+        description_text=db_reserve.description_text,
+        description_html=db_reserve.description_html,
         bonuses=bonuses,
         deployables=deployables,
         actions=actions,
@@ -54,69 +61,156 @@ def convert_reserve_to_graphql(db_reserve: Reserve) -> ReserveType:
     )
 
 
+def convert_import_job_to_graphql(job: ImportJob) -> ImportJobType:
+    """Convert SQLAlchemy ImportJob model to GraphQL type"""
+    return ImportJobType(
+        id=job.id,
+        status=job.status,
+        total=job.total,
+        processed=job.processed,
+        imported=job.imported,
+        skipped=job.skipped,
+        invalid=job.invalid,
+        errors=[ImportJobErrorType(**error) for error in job.errors],
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+def with_own_session(info: Info, load):
+    """Wrap ``load(db)`` to run on a session of its own.
+
+    Root fields of one query resolve concurrently and must not share the
+    request's session across threads.
+    """
+    session_factory = info.context["session_factory"]
+    
+    def run():
+        db = session_factory()
+        try:
+            return load(db)
+        finally:
+            db.close()
+    
+    return run
+
+
+async def threadpool_read(info: Info, load):
+    """Run ``load(db)`` in the threadpool, keeping the event loop free"""
+    return await run_in_threadpool(with_own_session(info, load))
+
+
+async def coalesced_read(info: Info, key, load):
+    """Run ``load(db)`` in the threadpool, sharing the result with identical in-flight reads"""
+    # Keyed by database, so identical queries against different campaigns are not shared
+    return await reads.do(read_key(info.context["db"], key), with_own_session(info, load))
+
+
 @strawberry.type
 class Query:
     @strawberry.field
-    def reserves(
+    async def reserves(
         self,
         info: Info,
         type: Optional[ReserveTypeEnum] = None,
+        label_prefix: Optional[str] = None,
         skip: int = 0,
         limit: int = 100
     ) -> List[ReserveType]:
         """Get all reserves with optional filtering"""
-        db: Session = info.context["db"]
-        query = db.query(Reserve)
-        
-        if type:
-            query = query.filter(Reserve.type == type.value)
+        def load(db: Session):
+            query = db.query(Reserve)
+            
+            if type:
+                query = query.filter(Reserve.type == type.value)
+            
+            if label_prefix:
+                query = query.filter(filters.label_prefix(label_prefix))
+            
+            db_reserves = query.order_by(Reserve.id).offset(skip).limit(limit).all()
+            return [convert_reserve_to_graphql(r) for r in db_reserves]
         
-        db_reserves = query.offset(skip).limit(limit).all()
-        return [convert_reserve_to_graphql(r) for r in db_reserves]
+        return await coalesced_read(info, ("gql.reserves", type, label_prefix, skip, limit), load)
     
     @strawberry.field
-    def reserve(self, info: Info, id: str) -> Optional[ReserveType]:
+    async def reserve(self, info: Info, id: str) -> Optional[ReserveType]:
         """Get a specific reserve by ID"""
-        db: Session = info.context["db"]
-        db_reserve = db.query(Reserve).filter(Reserve.id == id).first()
+        def load(db: Session):
+            db_reserve = db.query(Reserve).filter(Reserve.id == id).first()
+            
+            if not db_reserve:
+                return None
+            
+            return convert_reserve_to_graphql(db_reserve)
         
-        if not db_reserve:
-            return None
-        
-        return convert_reserve_to_graphql(db_reserve)
+        return await coalesced_read(info, ("gql.reserve", id), load)
     
     @strawberry.field
-    def reserves_by_label(self, info: Info, label: str) -> List[ReserveType]:
+    async def reserves_by_label(self, info: Info, label: str) -> List[ReserveType]:
         """Get reserves by label (case-insensitive search)"""
-        db: Session = info.context["db"]
-        db_reserves = db.query(Reserve).filter(
-            func.lower(Reserve.label).contains(label.lower())
-        ).all()
+        def load(db: Session):
+            db_reserves = db.query(Reserve).filter(filters.label_contains(label)).order_by(Reserve.id).all()
+            return [convert_reserve_to_graphql(r) for r in db_reserves]
         
-        return [convert_reserve_to_graphql(r) for r in db_reserves]
+        return await coalesced_read(info, ("gql.reserves_by_label", label), load)
     
     @strawberry.field
-    def random_reserves(
+    async def random_reserves(
         self,
         info: Info,
         count: int = 1,
         type: Optional[ReserveTypeEnum] = None
     ) -> List[ReserveType]:
         """Get random reserves with optional type filtering"""
-        db: Session = info.context["db"]
-        query = db.query(Reserve)
-        
-        if type:
-            query = query.filter(Reserve.type == type.value)
+        def load(db: Session):
+            # Sample from ids only, then load just the selected rows
+            query = db.query(Reserve.id)
+            
+            if type:
+                query = query.filter(Reserve.type == type.value)
+            
+            all_ids = [row.id for row in query]
+            
+            if not all_ids:
+                return []
+            
+            # Select random reserves without replacement
+            selected_count = min(count, len(all_ids))
+            selected_ids = random.sample(all_ids, selected_count)
+            
+            by_id = {r.id: r for r in db.query(Reserve).filter(Reserve.id.in_(selected_ids))}
+            random_reserves = [by_id[reserve_id] for reserve_id in selected_ids if reserve_id in by_id]
+            
+            return [convert_reserve_to_graphql(r) for r in random_reserves]
         
-        all_reserves = query.all()
+        # Random picks are per request, so they are never coalesced
+        return await threadpool_read(info, load)
+    
+    @strawberry.field
+    async def reserve_changes(self, info: Info, since: int = 0, limit: int = 1000) -> ReserveChangesType:
+        """Get reserves created, updated or deleted since a change token"""
+        since = max(since, 0)
+        limit = min(max(limit, 1), 10000)
         
-        if not all_reserves:
-            return []
+        def load(db: Session):
+            token, upserts, deleted, has_more = get_changes_since(db, since, limit)
+            return ReserveChangesType(
+                token=token,
+                upserts=[convert_reserve_to_graphql(r) for r in upserts],
+                deleted=deleted,
+                has_more=has_more,
+            )
         
-        # Select random reserves without replacement
-        selected_count = min(count, len(all_reserves))
-        random_reserves = random.sample(all_reserves, selected_count)
+        return await coalesced_read(info, ("gql.reserve_changes", since, limit), load)
+    
+    @strawberry.field
+    async def import_job(self, info: Info, id: str) -> Optional[ImportJobType]:
+        """Get the status and progress of a background import job"""
+        def load(db: Session):
+            job = get_import_job(db, id)
+            return convert_import_job_to_graphql(job) if job else None
         
-        return [convert_reserve_to_graphql(r) for r in random_reserves]
-
+        # Progress changes while the job runs, so polls are not coalesced
+        return await threadpool_read(info, load)
@@ -68,6 +68,8 @@ class ReserveType:
     type: ReserveTypeEnum
     label: str
     description: str
+    description_text: Optional[str] = None
+    description_html: Optional[str] = None
     bonuses: Optional[List[BonusType]] = None
     deployables: Optional[List[DeployableType]] = None
     actions: Optional[List[ActionType]] = None
@@ -76,6 +78,39 @@ class ReserveType:
     updated_at: datetime
 
 
+@strawberry.type
+class ReserveChangesType:
+    """GraphQL type for delta sync results"""
+    token: int
+    upserts: List[ReserveType]
+    deleted: List[str]
+    has_more: bool
+
+
+@strawberry.type
+class ImportJobErrorType:
+    """GraphQL type for a record that failed validation in an import job"""
+    index: int
+    message: str
+
+
+@strawberry.type
+class ImportJobType:
+    """GraphQL type for background import jobs"""
+    id: str
+    status: str
+    total: int
+    processed: int
+    imported: int
+    skipped: int
+    invalid: int
+    errors: List[ImportJobErrorType]
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 @strawberry.input
 class BonusInput:
     """GraphQL input for bonuses"""
@@ -0,0 +1,190 @@
+"""Opt-in request, database and GraphQL resolver instrumentation.
+
+Enabled with ``LANCER_RESERVES_INSTRUMENTATION=true``. Each request gets a
+``Server-Timing`` header splitting its time between SQL and everything
+else (validation, conversion, JSON encoding), and aggregate numbers are
+exposed in Prometheus text format on ``/metrics``. Nothing here talks to
+an external service.
+
+Resolver timings come from ``backend.graphql.instrumentation``, kept
+separate so that a REST-only app never imports Strawberry.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds in seconds, shared by all duration histograms
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    """Timings collected while serving a single request"""
+
+    __slots__ = ("db_queries", "db_time", "resolvers")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.resolvers: Dict[str, float] = defaultdict(float)
+
+
+# Set by TimingMiddleware; copied into threadpool workers along with the
+# rest of the request context, so sync endpoints see the same object.
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    """Thread-safe in-process metric registry"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.request_duration: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+        self.db_queries: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.db_duration: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.resolver_duration: Dict[str, Histogram] = defaultdict(Histogram)
+
+    def observe_request(self, method: str, route: str, status: int, duration: float, stats: RequestStats) -> None:
+        with self._lock:
+            self.requests[(method, route, status)] += 1
+            self.request_duration[(method, route)].observe(duration)
+            self.db_queries[(method, route)] += stats.db_queries
+            self.db_duration[(method, route)] += stats.db_time
+
+    def observe_resolver(self, field: str, duration: float) -> None:
+        with self._lock:
+            self.resolver_duration[field].observe(duration)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines.append("# HELP lancer_http_requests_total HTTP requests served")
+            lines.append("# TYPE lancer_http_requests_total counter")
+            for (method, route, status), value in sorted(self.requests.items()):
+                lines.append(f'lancer_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {value}')
+
+            lines.append("# HELP lancer_http_request_duration_seconds Time to serve HTTP requests")
+            lines.append("# TYPE lancer_http_request_duration_seconds histogram")
+            for (method, route), histogram in sorted(self.request_duration.items()):
+                _render_histogram(lines, "lancer_http_request_duration_seconds", f'method="{method}",route="{route}"', histogram)
+
+            lines.append("# HELP lancer_db_queries_total SQL statements executed")
+            lines.append("# TYPE lancer_db_queries_total counter")
+            for (method, route), value in sorted(self.db_queries.items()):
+                lines.append(f'lancer_db_queries_total{{method="{method}",route="{route}"}} {value}')
+
+            lines.append("# HELP lancer_db_query_duration_seconds_total Time spent executing SQL")
+            lines.append("# TYPE lancer_db_query_duration_seconds_total counter")
+            for (method, route), value in sorted(self.db_duration.items()):
+                lines.append(f'lancer_db_query_duration_seconds_total{{method="{method}",route="{route}"}} {value:.6f}')
+
+            lines.append("# HELP lancer_graphql_resolver_duration_seconds Time spent in root GraphQL resolvers")
+            lines.append("# TYPE lancer_graphql_resolver_duration_seconds histogram")
+            for field, histogram in sorted(self.resolver_duration.items()):
+                _render_histogram(lines, "lancer_graphql_resolver_duration_seconds", f'field="{field}"', histogram)
+        return "\n".join(lines) + "\n"
+
+
+def _render_histogram(lines, name: str, labels: str, histogram: Histogram) -> None:
+    for bound, value in zip(BUCKETS, histogram.counts):
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {value}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+metrics = Metrics()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_start", None)
+    stats = _current_stats.get()
+    if stats is not None and started is not None:
+        stats.db_queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def install_sqlalchemy_hooks() -> None:
+    """Count and time SQL statements on every engine"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class TimingMiddleware:
+    """ASGI middleware recording per-route timings and adding ``Server-Timing``"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats, time.perf_counter() - started).encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            metrics.observe_request(scope["method"], route_path, status, time.perf_counter() - started, stats)
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    entries = [
+        f"total;dur={total * 1000:.2f}",
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.db_queries} queries"',
+    ]
+    entries.extend(f"gql.{field};dur={duration * 1000:.2f}" for field, duration in stats.resolvers.items())
+    return ", ".join(entries)
+
+
+def record_resolver(field: str, duration: float) -> None:
+    """Record the time spent in a root GraphQL resolver for the current request"""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.resolvers[field] += duration
+    metrics.observe_resolver(field, duration)
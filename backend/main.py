@@ -1,142 +1,213 @@
-import json
-from pathlib import Path
+"""FastAPI application.
+
+``create_app()`` builds the application. The GraphQL stack (Strawberry,
+the schema and its resolvers) is imported and built only when GraphQL is
+enabled, and the REST routers only when the app is created, so importing
+this module stays cheap for seeding and CLI use.
+
+``backend.main:app`` and ``backend.main:schema`` still work: both are
+created on first access (``uvicorn backend.main:app``), or use
+``uvicorn --factory backend.main:create_app``.
+"""
 from contextlib import asynccontextmanager
+from functools import partial
+from typing import Dict, Optional
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import strawberry
-from strawberry.fastapi import GraphQLRouter
-
-from backend.database import init_db, get_db, SessionLocal
-from backend.api.v1 import api_router
-from backend.graphql.queries import Query
-from backend.graphql.mutations import Mutation
-from backend.models.reserves import Reserve
-
-
-def seed_database():
-    """Seed database with data from reserves.json if it exists and database is empty"""
-    reserves_file = Path("reserves.json")
-    if not reserves_file.exists():
-        print("No reserves.json file found. Skipping seed.")
-        return
-    
-    db = SessionLocal()
-    try:
-        # Check if database already has data
-        count = db.query(Reserve).count()
-        if count > 0:
-            print(f"Database already contains {count} reserves. Skipping seed.")
-            return
-        
-        # Load and seed data
-        with open(reserves_file, "r", encoding="utf-8") as f:
-            reserves_data = json.load(f)
-        
-        for reserve_dict in reserves_data:
-            db_reserve = Reserve(
-                id=reserve_dict["id"],
-                name=reserve_dict["name"],
-                type=reserve_dict["type"],
-                label=reserve_dict["label"],
-                description=reserve_dict["description"],
-                bonuses=reserve_dict.get("bonuses"),
-                deployables=reserve_dict.get("deployables"),
-                actions=reserve_dict.get("actions"),
-                synergies=reserve_dict.get("synergies"),
-            )
-            db.add(db_reserve)
-        
-        db.commit()
-        print(f"Successfully seeded database with {len(reserves_data)} reserves from reserves.json")
-    
-    except Exception as e:
-        print(f"Error seeding database: {e}")
-        db.rollback()
-    finally:
-        db.close()
+from fastapi.responses import PlainTextResponse
+
+from backend.config import Settings, settings
+
+_app: Optional[FastAPI] = None
+# One schema per set of schema extensions, i.e. per instrumentation setting
+_schemas: Dict[bool, object] = {}
+
+# Read when ``backend.database`` is first imported and shared by every app
+# in the process
+PROCESS_SETTINGS = ("database_url", "campaigns_dir", "max_open_campaigns")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan events for FastAPI application"""
+    from backend.database import init_db
+    from backend.seed import seed_database
+    from backend.services.jobs import import_jobs
+
     # Startup
     print("Initializing database...")
     init_db()
     print("Seeding database...")
     seed_database()
+    if app.state.admission_lanes:
+        import anyio
+
+        # Let the lanes, not the shared threadpool, decide what waits, so
+        # priority requests always find a free worker thread
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = max(limiter.total_tokens, sum(lane.limit for lane in app.state.admission_lanes.values()))
+    import_jobs.start()
     yield
     # Shutdown
     print("Application shutting down...")
+    import_jobs.stop()
+
 
+def get_schema(config: Settings = settings):
+    """Build the Strawberry schema (once per process and instrumentation setting)"""
+    schema = _schemas.get(config.instrumentation)
+    if schema is None:
+        from backend.graphql.executor import Schema
+        from backend.graphql.mutations import Mutation
+        from backend.graphql.queries import Query
 
-# Create FastAPI application
-app = FastAPI(
-    title="Lancer Reserves API",
-    description="REST and GraphQL API for managing Lancer TTRPG reserves",
-    version="1.0.0",
-    lifespan=lifespan,
-    docs_url="/docs",
-    redoc_url="/redoc",
-)
+        extensions = []
+        if config.instrumentation:
+            from backend.graphql.instrumentation import ResolverTimingExtension
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+            extensions.append(ResolverTimingExtension)
+        schema = _schemas[config.instrumentation] = Schema(query=Query, mutation=Mutation, extensions=extensions)
+    return schema
 
-# Include REST API routes
-app.include_router(api_router, prefix="/api/v1")
 
-# Configure GraphQL
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+def configure_services(config: Settings) -> None:
+    """Apply ``config`` to the process-wide read, write and import-job services"""
+    from backend.services.jobs import import_jobs
+    from backend.services.reserves import writes
+    from backend.singleflight import reads
+
+    changed = [name for name in PROCESS_SETTINGS if getattr(config, name) != getattr(settings, name)]
+    if changed:
+        raise ValueError(
+            f"{', '.join(changed)} can only be set through the environment (LANCER_RESERVES_*), "
+            "since the database engines are shared by the whole process"
+        )
+
+    reads.enabled = config.read_coalescing
+    writes.enabled = config.write_batching
+    writes.window = config.write_batch_window_ms / 1000
+    writes.max_batch = config.write_batch_max_size
+    import_jobs.batch_size = config.import_job_batch_size
+    import_jobs.workers = config.import_job_workers
 
 
 async def get_context():
     """Provide context for GraphQL requests"""
-    db = SessionLocal()
+    from backend.database import current_campaign, open_session
+
+    campaign = current_campaign.get()
+    db = open_session(campaign)
     try:
-        yield {"db": db}
+        # Read resolvers open their own sessions from the factory
+        yield {"db": db, "session_factory": partial(open_session, campaign), "campaign": campaign}
     finally:
         db.close()
 
 
-graphql_app = GraphQLRouter(
-    schema,
-    context_getter=get_context
-)
+def create_app(config: Settings = settings) -> FastAPI:
+    """Create the FastAPI application with the features enabled in ``config``.
+
+    Read coalescing, write batching and import jobs are process-wide, so
+    they follow the most recently created app. The database settings must
+    match the process settings; a ``config`` that changes them is rejected.
+    """
+    from backend.api.v1 import api_router
+    from backend.campaigns import CampaignMiddleware
+
+    configure_services(config)
+
+    app = FastAPI(
+        title="Lancer Reserves API",
+        description="REST and GraphQL API for managing Lancer TTRPG reserves",
+        version="1.0.0",
+        lifespan=lifespan,
+        docs_url="/docs" if config.docs else None,
+        redoc_url="/redoc" if config.docs else None,
+        openapi_url="/openapi.json" if config.docs else None,
+    )
+
+    app.state.admission_lanes = {}
+    if config.admission_control:
+        from backend.admission import AdmissionMiddleware, build_lanes
+
+        # Added before CORS so that 503 responses still carry CORS headers
+        app.state.admission_lanes = build_lanes(config)
+        app.add_middleware(AdmissionMiddleware, lanes=app.state.admission_lanes, retry_after=config.admission_retry_after)
+
+    # Outside admission control, which classifies requests by the path without
+    # the campaign prefix
+    app.add_middleware(CampaignMiddleware)
+
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, replace with specific origins
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    if config.instrumentation:
+        from backend.instrumentation import TimingMiddleware, install_sqlalchemy_hooks
+
+        install_sqlalchemy_hooks()
+        app.add_middleware(TimingMiddleware)
+
+    # Include REST API routes
+    app.include_router(api_router, prefix="/api/v1")
+
+    # Configure GraphQL
+    if config.graphql:
+        from strawberry.fastapi import GraphQLRouter
+
+        graphql_app = GraphQLRouter(get_schema(config), context_getter=get_context)
+        app.include_router(graphql_app, prefix="/graphql", tags=["graphql"])
+
+    endpoints = {"rest_api": "/api/v1/reserves"}
+    if config.graphql:
+        endpoints["graphql"] = "/graphql"
+    if config.docs:
+        endpoints["documentation"] = "/docs"
+        endpoints["redoc"] = "/redoc"
+
+    @app.get("/", tags=["root"])
+    def read_root():
+        """Root endpoint with API information"""
+        return {
+            "message": "Lancer Reserves API",
+            "version": "1.0.0",
+            "endpoints": endpoints,
+        }
 
-app.include_router(graphql_app, prefix="/graphql", tags=["graphql"])
+    @app.get("/health", tags=["health"])
+    def health_check():
+        """Health check endpoint"""
+        return {"status": "healthy"}
 
+    if config.instrumentation:
+        from backend.instrumentation import metrics
 
-@app.get("/", tags=["root"])
-def read_root():
-    """Root endpoint with API information"""
-    return {
-        "message": "Lancer Reserves API",
-        "version": "1.0.0",
-        "endpoints": {
-            "rest_api": "/api/v1/reserves",
-            "graphql": "/graphql",
-            "documentation": "/docs",
-            "redoc": "/redoc",
-        }
-    }
+        @app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+        def read_metrics():
+            """Prometheus metrics for request, SQL and resolver timings"""
+            return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
+    return app
 
-@app.get("/health", tags=["health"])
-def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+
+def __getattr__(name: str):
+    # Build the default app and schema on first access only
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    if name == "schema":
+        return get_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
-
-
-
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000)
@@ -0,0 +1,87 @@
+"""Schema migrations for existing databases.
+
+``init_db`` creates missing tables with ``create_all``, which never alters
+tables that already exist. Changes to existing tables (new indexes,
+columns, ...) are listed here instead and applied in order. The applied
+version is tracked in SQLite's ``PRAGMA user_version``.
+
+To add a migration, append a ``(version, description, function)`` entry
+to ``MIGRATIONS`` with the next version number and mirror the change on
+the models so fresh databases get it from ``create_all``.
+"""
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Connection, Engine, text
+
+from backend.services.descriptions import render_description
+
+
+def _add_query_pattern_indexes(conn: Connection) -> None:
+    # Composite and expression indexes matching the list/filter queries
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_reserves_type_id ON reserves (type, id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_reserves_type_label ON reserves (type, label)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_reserves_lower_label ON reserves (lower(label))")
+    # Superseded by the primary key and ix_reserves_type_id
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_reserves_id")
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_reserves_type")
+
+
+def _add_description_forms(conn: Connection) -> None:
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(reserves)")}
+    for column in ("description_text", "description_html"):
+        if column not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE reserves ADD COLUMN {column} TEXT")
+
+    rows = conn.exec_driver_sql("SELECT id, description FROM reserves WHERE description_text IS NULL").fetchall()
+    if rows:
+        conn.execute(
+            text("UPDATE reserves SET description_text = :description_text, description_html = :description_html WHERE id = :id"),
+            [dict(render_description(description), id=reserve_id) for reserve_id, description in rows],
+        )
+
+
+def _index_type_with_lower_label(conn: Connection) -> None:
+    # Label filters compare lower(label), so a plain (type, label) index is
+    # never chosen; (type, lower(label)) serves type + label_prefix ranges
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_reserves_type_label")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_reserves_type_lower_label ON reserves (type, lower(label))")
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Add composite and lower(label) indexes", _add_query_pattern_indexes),
+    (2, "Add and backfill description_text and description_html", _add_description_forms),
+    (3, "Replace the (type, label) index with (type, lower(label))", _index_type_with_lower_label),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn: Connection) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def _set_version(conn: Connection, version: int) -> None:
+    # PRAGMA values can't be bound parameters
+    conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+
+def stamp_latest(engine: Engine) -> None:
+    """Mark a database freshly built by ``create_all`` as fully migrated"""
+    with engine.begin() as conn:
+        _set_version(conn, LATEST_VERSION)
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """Apply pending migrations, each in its own transaction.
+
+    Returns the descriptions of the migrations that were applied.
+    """
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        with engine.begin() as conn:
+            if get_version(conn) >= version:
+                continue
+            migrate(conn)
+            _set_version(conn, version)
+        applied.append(description)
+    return applied
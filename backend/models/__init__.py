@@ -1,5 +1,4 @@
-from backend.models.reserves import Reserve
-
-__all__ = ["Reserve"]
-
+from backend.models.reserves import Reserve, ReserveChange
+from backend.models.jobs import ImportJob
 
+__all__ = ["Reserve", "ReserveChange", "ImportJob"]
@@ -0,0 +1,34 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from backend.database import Base
+
+
+class ImportJob(Base):
+    """A bulk reserve import processed in the background.
+
+    The submitted records stay in ``payload`` until the job finishes, so
+    queued or interrupted jobs can be picked up again after a restart.
+    """
+
+    __tablename__ = "import_jobs"
+
+    id = Column(String, primary_key=True)
+    status = Column(String, nullable=False, index=True)  # queued, running, succeeded, failed
+    payload = Column(JSON, nullable=True)
+
+    # Progress counters, updated after every batch
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    imported = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)  # id already existed
+    invalid = Column(Integer, nullable=False, default=0)  # failed validation
+
+    errors = Column(JSON, nullable=False, default=list)  # [{"index": ..., "message": ...}]
+    error = Column(Text, nullable=True)  # why a failed job stopped
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ImportJob(id={self.id}, status={self.status}, processed={self.processed}/{self.total})>"
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, JSON
+from sqlalchemy import Column, Index, Integer, String, Text, DateTime, JSON, func
 from backend.database import Base
 
 
@@ -7,12 +7,19 @@ class Reserve(Base):
     """SQLAlchemy model for Lancer reserves"""
     
     __tablename__ = "reserves"
+    __table_args__ = (
+        # Type filter with id ordering (list pagination, random, by-type)
+        Index("ix_reserves_type_id", "type", "id"),
+    )
 
-    id = Column(String, primary_key=True, index=True)
+    id = Column(String, primary_key=True)
     name = Column(String, nullable=False, index=True)
-    type = Column(String, nullable=False, index=True)  # Bonus, Resource, Mech, Tactical
+    type = Column(String, nullable=False)  # Bonus, Resource, Mech, Tactical
     label = Column(String, nullable=False)
     description = Column(Text, nullable=False)
+    # Derived from description on every write (backend/services/descriptions.py)
+    description_text = Column(Text, nullable=True)
+    description_html = Column(Text, nullable=True)
     
     # Optional JSON fields for flexible data storage
     bonuses = Column(JSON, nullable=True)
@@ -28,3 +35,25 @@ class Reserve(Base):
         return f"<Reserve(id={self.id}, name={self.name}, type={self.type})>"
 
 
+# Case-insensitive label prefix searches, alone and combined with a type filter
+Index("ix_reserves_lower_label", func.lower(Reserve.label))
+Index("ix_reserves_type_lower_label", Reserve.type, func.lower(Reserve.label))
+
+
+class ReserveChange(Base):
+    """Append-only change log used for delta sync.
+
+    Every write to ``reserves`` appends one row here. ``version`` is the
+    monotonically increasing change token handed out to sync clients.
+    """
+
+    __tablename__ = "reserve_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    version = Column(Integer, primary_key=True, autoincrement=True)
+    reserve_id = Column(String, nullable=False, index=True)
+    op = Column(String, nullable=False)  # upsert, delete
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ReserveChange(version={self.version}, reserve_id={self.reserve_id}, op={self.op})>"
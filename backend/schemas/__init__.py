@@ -3,6 +3,9 @@ from backend.schemas.reserves import (
     ReserveCreate,
     ReserveUpdate,
     ReserveResponse,
+    ReserveChanges,
+    ReserveBatchRequest,
+    ReserveBatchResponse,
     ReserveType,
     Bonus,
     Deployable,
@@ -10,13 +13,23 @@ from backend.schemas.reserves import (
     RangeValue,
     DamageValue,
     Synergy,
+    ReserveRecord,
+    ReservePatch,
+    reserve_record_adapter,
+    reserve_records_adapter,
+    reserve_patch_adapter,
+    load_reserve_records,
 )
+from backend.schemas.jobs import ImportJobError, ImportJobResponse
 
 __all__ = [
     "ReserveBase",
     "ReserveCreate",
     "ReserveUpdate",
     "ReserveResponse",
+    "ReserveChanges",
+    "ReserveBatchRequest",
+    "ReserveBatchResponse",
     "ReserveType",
     "Bonus",
     "Deployable",
@@ -24,6 +37,14 @@ __all__ = [
     "RangeValue",
     "DamageValue",
     "Synergy",
+    "ReserveRecord",
+    "ReservePatch",
+    "reserve_record_adapter",
+    "reserve_records_adapter",
+    "reserve_patch_adapter",
+    "load_reserve_records",
+    "ImportJobError",
+    "ImportJobResponse",
 ]
 
 
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class ImportJobError(BaseModel):
+    """A record that failed validation in an import job"""
+    index: int = Field(..., description="Position of the record in the submitted list")
+    message: str
+
+
+class ImportJobResponse(BaseModel):
+    """Status and progress of a background import job"""
+    id: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    total: int = Field(..., description="Number of submitted records")
+    processed: int = Field(..., description="Records handled so far")
+    imported: int = Field(..., description="Records inserted")
+    skipped: int = Field(..., description="Records skipped because the id already existed")
+    invalid: int = Field(..., description="Records that failed validation")
+    errors: List[ImportJobError] = Field(..., description="Validation errors (the first 100)")
+    error: Optional[str] = Field(None, description="Why the job failed, if it did")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,7 +1,8 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from typing import Any, Optional, List
+from typing_extensions import Annotated, NotRequired, TypedDict
+from pydantic import AfterValidator, BaseModel, Field, TypeAdapter
 
 
 class ReserveType(str, Enum):
@@ -92,3 +93,119 @@ class ReserveResponse(ReserveBase):
         from_attributes = True
 
 
+# Stored derived forms of ``description`` (plain text, sanitized HTML). Only
+# returned when requested with ``fields=``, so default responses don't carry
+# the description three times.
+DESCRIPTION_FORMS = ("description_text", "description_html")
+
+
+class ReserveChanges(BaseModel):
+    """Schema for delta sync responses"""
+    token: int = Field(..., description="Change token to pass as 'since' on the next call")
+    upserts: List[ReserveResponse] = Field(default_factory=list, description="Reserves created or updated since the given token")
+    deleted: List[str] = Field(default_factory=list, description="IDs of reserves deleted since the given token")
+    has_more: bool = Field(False, description="True if more changes are pending after 'token'")
+
+
+
+class ReserveBatchRequest(BaseModel):
+    """Schema for fetching many reserves by id"""
+    ids: List[str] = Field(..., min_length=1, max_length=1000, description="Reserve IDs to fetch (max 1000)")
+
+
+class ReserveBatchResponse(BaseModel):
+    """Schema for multi-get responses"""
+    reserves: List[ReserveResponse] = Field(default_factory=list, description="Found reserves, in request order")
+    missing: List[str] = Field(default_factory=list, description="Requested IDs that do not exist")
+
+
+# Storage records
+#
+# Write endpoints validate straight into the dict shape stored in the
+# ``reserves`` table, so nested bonuses/actions/etc. are never built as
+# models only to be dumped back to dicts for the JSON columns.
+
+StoredReserveType = Annotated[ReserveType, AfterValidator(lambda t: t.value)]
+
+
+class BonusRecord(TypedDict):
+    """Stored bonus"""
+    id: str
+    val: int
+
+
+class DeployableRecord(TypedDict):
+    """Stored deployable item"""
+    name: str
+    type: str
+    size: int
+    detail: str
+
+
+class RangeValueRecord(TypedDict):
+    """Stored range value"""
+    type: str
+    val: int
+
+
+class DamageValueRecord(TypedDict):
+    """Stored damage value"""
+    type: str
+    val: str
+
+
+class ActionRecord(TypedDict):
+    """Stored action"""
+    name: str
+    activation: str
+    detail: str
+    range: NotRequired[Optional[List[RangeValueRecord]]]
+    damage: NotRequired[Optional[List[DamageValueRecord]]]
+
+
+class SynergyRecord(TypedDict):
+    """Stored synergy effect"""
+    locations: List[str]
+    detail: str
+
+
+class ReserveRecord(TypedDict):
+    """Reserve create payload, validated directly into its storage shape"""
+    id: Annotated[str, Field(description="Unique identifier (e.g., 'reserve_skill')")]
+    name: Annotated[str, Field(description="Display name of the reserve")]
+    type: Annotated[StoredReserveType, Field(description="Type of reserve (Bonus, Resource, Mech, Tactical)")]
+    label: Annotated[str, Field(description="Category label for the reserve")]
+    description: Annotated[str, Field(description="Detailed description (HTML-compatible)")]
+    bonuses: NotRequired[Annotated[Optional[List[BonusRecord]], Field(description="Array of bonus effects")]]
+    deployables: NotRequired[Annotated[Optional[List[DeployableRecord]], Field(description="Array of deployable items")]]
+    actions: NotRequired[Annotated[Optional[List[ActionRecord]], Field(description="Array of activatable actions")]]
+    synergies: NotRequired[Annotated[Optional[List[SynergyRecord]], Field(description="Array of synergy effects")]]
+
+
+class ReservePatch(TypedDict, total=False):
+    """Reserve update payload; only the keys sent by the client are present"""
+    name: Optional[str]
+    type: Optional[StoredReserveType]
+    label: Optional[str]
+    description: Optional[str]
+    bonuses: Optional[List[BonusRecord]]
+    deployables: Optional[List[DeployableRecord]]
+    actions: Optional[List[ActionRecord]]
+    synergies: Optional[List[SynergyRecord]]
+
+
+reserve_record_adapter = TypeAdapter(ReserveRecord)
+reserve_records_adapter = TypeAdapter(List[ReserveRecord])
+reserve_patch_adapter = TypeAdapter(ReservePatch)
+
+
+def load_reserve_records(data: Any, trusted: bool = False) -> List[ReserveRecord]:
+    """Turn a parsed JSON list of reserves into storage records.
+
+    ``trusted`` skips validation entirely and should only be used for
+    sources already known to match the storage shape, such as the bundled
+    ``reserves.json``.
+    """
+    if trusted:
+        return data
+    return reserve_records_adapter.validate_python(data)
@@ -0,0 +1,54 @@
+"""Seed the base catalog from reserves.json.
+
+Kept apart from ``backend.main`` so seeding (``python -m backend.seed``)
+doesn't import the web stack.
+"""
+import json
+from pathlib import Path
+
+from backend.database import init_db, SessionLocal
+from backend.models.reserves import Reserve
+from backend.schemas.reserves import load_reserve_records
+from backend.services.changes import backfill_changes
+from backend.services.reserves import import_reserves
+
+
+def seed_database():
+    """Seed database with data from reserves.json if it exists and database is empty"""
+    reserves_file = Path("reserves.json")
+    if not reserves_file.exists():
+        print("No reserves.json file found. Skipping seed.")
+        return
+    
+    db = SessionLocal()
+    try:
+        # Check if database already has data
+        count = db.query(Reserve).count()
+        if count > 0:
+            print(f"Database already contains {count} reserves. Skipping seed.")
+            backfilled = backfill_changes(db)
+            if backfilled:
+                print(f"Backfilled change log with {backfilled} reserves.")
+            return
+        
+        # Load and seed data
+        with open(reserves_file, "r", encoding="utf-8") as f:
+            reserves_data = json.load(f)
+        
+        # reserves.json ships with the app and already matches the storage shape
+        reserves_data = load_reserve_records(reserves_data, trusted=True)
+        import_reserves(db, reserves_data)
+        print(f"Successfully seeded database with {len(reserves_data)} reserves from reserves.json")
+    
+    except Exception as e:
+        print(f"Error seeding database: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("Initializing database...")
+    init_db()
+    print("Seeding database...")
+    seed_database()
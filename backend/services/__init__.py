@@ -0,0 +1 @@
+# Shared service layer used by both the REST and GraphQL APIs
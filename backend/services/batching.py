@@ -0,0 +1,149 @@
+"""Group commit for single-reserve writes.
+
+With ``LANCER_RESERVES_WRITE_BATCHING=true``, creates, updates and deletes
+are not committed by the request thread. They are queued for one writer
+thread, which runs every write that arrives within a short window in a
+single transaction and commits once. Each caller is woken up with its own
+result (or exception) only after that shared commit, so a response is
+never sent for a write that is not yet durable.
+
+SQLite pays an fsync and takes the writer lock per commit, so sharing one
+commit between many writes raises write throughput sharply under
+concurrency, at the cost of up to one window of extra latency per write.
+
+Writes that fail with one of the ``expected`` errors (e.g. "not found")
+did not change anything, so they fail alone and the rest of the batch
+still commits. Any other failure rolls the batch back and replays each
+write in its own transaction, so one bad write cannot fail its neighbours.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import InstanceState, Session
+
+
+class _Write:
+    __slots__ = ("bind", "fn", "args", "done", "result", "error")
+
+    def __init__(self, bind: Engine, fn: Callable[..., Any], args: tuple):
+        self.bind = bind
+        self.fn = fn
+        self.args = args
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def _detached(db: Session, result: Any) -> Any:
+    """Take an ORM result out of the shared session.
+
+    Otherwise a later write to the same row in the batch would update the
+    same identity-mapped object, and every caller would see the last write.
+    """
+    state = inspect(result, raiseerr=False)
+    if isinstance(state, InstanceState) and state.session is db:
+        db.expunge(result)
+    return result
+
+
+class WriteBatcher:
+    """Funnel writes through one thread that commits them in groups"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[Engine], Session],
+        window: float = 0.002,
+        max_batch: int = 256,
+        expected: Tuple[Type[BaseException], ...] = (),
+        enabled: bool = True,
+    ):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self.expected = expected
+        self.enabled = enabled
+        self.batches = 0
+        self.writes = 0
+        self._queue: "queue.Queue[_Write]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, bind: Engine, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(db, *args)`` on ``bind`` in the next group commit and return its result"""
+        write = _Write(bind, fn, args)
+        self._ensure_started()
+        self._queue.put(write)
+        write.done.wait()
+        if write.error is not None:
+            raise write.error
+        return write.result
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-batcher", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            # One transaction per database (campaign shard) in the batch
+            groups: Dict[Engine, List[_Write]] = {}
+            for write in batch:
+                groups.setdefault(write.bind, []).append(write)
+            for bind, group in groups.items():
+                try:
+                    self._commit_batch(bind, group)
+                except Exception as exc:
+                    for write in group:
+                        write.result, write.error = None, exc
+                finally:
+                    for write in group:
+                        write.done.set()
+
+    def _collect(self) -> List[_Write]:
+        """Block for one write, then gather more until the window closes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit_batch(self, bind: Engine, batch: List[_Write]) -> None:
+        db = self.session_factory(bind)
+        try:
+            try:
+                for write in batch:
+                    try:
+                        write.result = _detached(db, write.fn(db, *write.args))
+                    except self.expected as exc:
+                        write.error = exc
+                db.commit()
+            except Exception:
+                db.rollback()
+                self._commit_each(db, batch)
+            self.batches += 1
+            self.writes += len(batch)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _commit_each(db: Session, batch: List[_Write]) -> None:
+        for write in batch:
+            write.result = write.error = None
+            try:
+                write.result = _detached(db, write.fn(db, *write.args))
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                write.error = exc
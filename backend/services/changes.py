@@ -0,0 +1,133 @@
+"""Change log and delta sync.
+
+In a campaign shard the visible catalog is the campaign's own reserves
+plus the base catalog's, so its feed merges two change logs: the shard's
+and the attached base catalog's. The token then packs both positions as
+``shard_version * CAMPAIGN_TOKEN_SPAN + base_version``; clients treat it
+as opaque either way.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.database import BASE_SCHEMA, attaches_base_catalog
+from backend.models.reserves import Reserve, ReserveChange
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+CAMPAIGN_TOKEN_SPAN = 10 ** 9
+
+# Ids per IN list, under the 999 bound parameters older SQLite builds allow
+IN_CHUNK = 900
+
+
+def record_changes(db: Session, reserve_ids: Iterable[str], op: str = UPSERT) -> None:
+    """Append change-log entries for the given reserves.
+
+    Must be called inside the same transaction as the write it describes so
+    the change token and the data never disagree.
+    """
+    db.add_all([ReserveChange(reserve_id=reserve_id, op=op) for reserve_id in reserve_ids])
+
+
+def backfill_changes(db: Session) -> int:
+    """Seed the change log for databases created before it existed.
+
+    Returns the number of entries written (0 if the log is already populated).
+    """
+    if db.query(ReserveChange.version).first() is not None:
+        return 0
+    reserve_ids = [row.id for row in db.query(Reserve.id).order_by(Reserve.id)]
+    record_changes(db, reserve_ids)
+    db.commit()
+    return len(reserve_ids)
+
+
+def _reserves_by_id(db: Session, reserve_ids: List[str]) -> Dict[str, Reserve]:
+    """Load the given reserves that still exist, keyed by id"""
+    by_id = {}
+    for start in range(0, len(reserve_ids), IN_CHUNK):
+        chunk = reserve_ids[start:start + IN_CHUNK]
+        by_id.update((r.id, r) for r in db.query(Reserve).filter(Reserve.id.in_(chunk)))
+    return by_id
+
+
+def _read_log(db: Session, since: int, limit: int, schema: Optional[str] = None) -> Tuple[list, bool]:
+    """Up to ``limit`` change-log rows after ``since``, and whether more follow"""
+    # Plain rows rather than ReserveChange objects: versions in the shard's
+    # and the base catalog's logs overlap and would clash in the identity map
+    query = (
+        db.query(ReserveChange.version, ReserveChange.reserve_id, ReserveChange.op)
+        .filter(ReserveChange.version > since)
+        .order_by(ReserveChange.version)
+        .limit(limit + 1)
+    )
+    if schema is not None:
+        query = query.execution_options(schema_translate_map={None: schema})
+    changes = query.all()
+    return changes[:limit], len(changes) > limit
+
+
+def get_changes_since(db: Session, since: int, limit: int) -> Tuple[int, List[Reserve], List[str], bool]:
+    """Collapse the change log after ``since`` into upserts and tombstones.
+
+    Returns ``(token, upserts, deleted_ids, has_more)``. ``token`` is the
+    version of the last change covered and should be passed back as ``since``
+    on the next call; when ``has_more`` is true the client should keep paging.
+    """
+    if attaches_base_catalog(db.get_bind()):
+        return _get_campaign_changes_since(db, since, limit)
+
+    changes, has_more = _read_log(db, since, limit)
+
+    if not changes:
+        return since, [], [], False
+
+    # Only the last operation per reserve matters to the client
+    latest_ops: Dict[str, str] = {}
+    for change in changes:
+        latest_ops.pop(change.reserve_id, None)
+        latest_ops[change.reserve_id] = change.op
+
+    upsert_ids = [reserve_id for reserve_id, op in latest_ops.items() if op == UPSERT]
+    deleted_ids = [reserve_id for reserve_id, op in latest_ops.items() if op == DELETE]
+
+    upserts = []
+    if upsert_ids:
+        by_id = _reserves_by_id(db, upsert_ids)
+        # A reserve missing here was deleted after this page; its tombstone
+        # arrives on a later page.
+        upserts = [by_id[reserve_id] for reserve_id in upsert_ids if reserve_id in by_id]
+
+    return changes[-1].version, upserts, deleted_ids, has_more
+
+
+def _get_campaign_changes_since(db: Session, since: int, limit: int) -> Tuple[int, List[Reserve], List[str], bool]:
+    """Feed of a campaign's visible catalog: its own changes, then the base catalog's"""
+    shard_since, base_since = divmod(since, CAMPAIGN_TOKEN_SPAN)
+    changes, has_more = _read_log(db, shard_since, limit)
+    shard_token = changes[-1].version if changes else shard_since
+
+    base_token = base_since
+    if not has_more and len(changes) < limit:
+        base_changes, has_more = _read_log(db, base_since, limit - len(changes), BASE_SCHEMA)
+        if base_changes:
+            base_token = base_changes[-1].version
+        changes += base_changes
+    elif not has_more:
+        # The page is full; base changes may still follow
+        has_more = True
+
+    if not changes:
+        return since, [], [], False
+
+    # The two logs can disagree about a reserve (e.g. a base row deleted
+    # while the campaign overrode it), so report each changed reserve as it
+    # is visible now rather than by its last logged operation
+    reserve_ids = list(dict.fromkeys(change.reserve_id for change in changes))
+    by_id = _reserves_by_id(db, reserve_ids)
+    upserts = [by_id[reserve_id] for reserve_id in reserve_ids if reserve_id in by_id]
+    deleted_ids = [reserve_id for reserve_id in reserve_ids if reserve_id not in by_id]
+
+    return shard_token * CAMPAIGN_TOKEN_SPAN + base_token, upserts, deleted_ids, has_more
@@ -0,0 +1,92 @@
+"""Derived forms of reserve descriptions.
+
+``description`` is stored as submitted. Writes also store two forms derived
+from it, so readers never have to process markup per request:
+
+- ``description_text``: markup stripped, entities decoded, ``<br>`` and
+  block elements turned into line breaks. Meant for search and plain-text
+  clients.
+- ``description_html``: sanitized HTML that is safe to insert into a page.
+  Only the tags in ``ALLOWED_TAGS`` are kept, all attributes are dropped,
+  and ``<script>``/``<style>`` content is removed.
+"""
+from html import escape
+from html.parser import HTMLParser
+from typing import Dict, List
+
+ALLOWED_TAGS = frozenset({"b", "strong", "i", "em", "u", "s", "br", "p", "ul", "ol", "li", "code", "sub", "sup"})
+VOID_TAGS = frozenset({"br"})
+# Tags dropped together with everything inside them
+DROPPED_TAGS = frozenset({"script", "style", "iframe", "object", "embed", "template", "noscript"})
+# Tags that start a new line in the plain-text form
+LINE_BREAK_TAGS = frozenset({"br", "p", "div", "ul", "ol", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6"})
+
+
+class _DescriptionParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html: List[str] = []
+        self.text: List[str] = []
+        self._open: List[str] = []
+        self._dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self._dropping += 1
+            return
+        if self._dropping:
+            return
+        if tag in LINE_BREAK_TAGS:
+            self.text.append("\n")
+        if tag in ALLOWED_TAGS:
+            self.html.append(f"<{tag}>")
+            if tag not in VOID_TAGS:
+                self._open.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self._dropping = max(self._dropping - 1, 0)
+            return
+        if self._dropping:
+            return
+        if tag in LINE_BREAK_TAGS and tag not in VOID_TAGS:
+            self.text.append("\n")
+        if tag in self._open:
+            # Also close anything left open inside it
+            while self._open:
+                open_tag = self._open.pop()
+                self.html.append(f"</{open_tag}>")
+                if open_tag == tag:
+                    break
+
+    def handle_data(self, data):
+        if self._dropping:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def close(self):
+        super().close()
+        while self._open:
+            self.html.append(f"</{self._open.pop()}>")
+
+
+def _normalize_text(text: str) -> str:
+    """Collapse whitespace within lines and runs of blank lines"""
+    lines = []
+    for line in text.split("\n"):
+        line = " ".join(line.split())
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def render_description(description: str) -> Dict[str, str]:
+    """Derive the stored plain-text and sanitized HTML forms of a description"""
+    parser = _DescriptionParser()
+    parser.feed(description)
+    parser.close()
+    return {
+        "description_text": _normalize_text("".join(parser.text)),
+        "description_html": "".join(parser.html),
+    }
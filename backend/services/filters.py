@@ -0,0 +1,28 @@
+"""Reserve filters shared by the REST and GraphQL read paths.
+
+Kept in one place so both APIs issue the same SQL and hit the same
+indexes (see ``backend/migrations.py``).
+"""
+from sqlalchemy import and_, func
+
+from backend.models.reserves import Reserve
+
+
+def label_contains(label: str):
+    """Case-insensitive substring match on the label"""
+    return func.lower(Reserve.label).contains(label.lower())
+
+
+def label_prefix(prefix: str):
+    """Case-insensitive prefix match on the label.
+
+    Written as a range on ``lower(label)`` rather than ``LIKE 'x%'`` so
+    SQLite can use the ``ix_reserves_lower_label`` expression index (or
+    ``ix_reserves_type_lower_label`` together with a type filter).
+    """
+    prefix = prefix.lower()
+    lower_label = func.lower(Reserve.label)
+    if not prefix:
+        return lower_label.isnot(None)
+    upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(lower_label >= prefix, lower_label < upper_bound)
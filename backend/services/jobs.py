@@ -0,0 +1,215 @@
+"""Background import jobs.
+
+``POST /api/v1/jobs/import`` and the ``startImportJob`` mutation store the
+submitted records in an ``import_jobs`` row and return straight away. A
+single worker thread then validates and inserts the records in batches,
+committing each batch together with the job's progress counters, so the
+counters always match what is in the database. Jobs that were queued or
+running when the process stopped are resumed from their last committed
+batch on the next start.
+
+Validation can optionally run in a process pool
+(``LANCER_RESERVES_IMPORT_JOB_WORKERS``), which keeps it off the GIL that
+the API threads share.
+"""
+import multiprocessing
+import queue
+import sys
+import threading
+import traceback
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.database import engines, open_session
+from backend.models.jobs import ImportJob
+from backend.schemas.reserves import ReserveRecord, reserve_records_adapter
+from backend.services.reserves import insert_new_reserves
+from backend.singleflight import writes_committed
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Only the first validation errors are kept on the job; ``invalid`` has the count
+MAX_STORED_ERRORS = 100
+
+JobError = Dict[str, Any]
+
+
+def validate_batch(items: Sequence[Any], offset: int) -> Tuple[List[ReserveRecord], List[JobError]]:
+    """Validate a slice of submitted records, separating out the invalid ones.
+
+    Module-level so it can run in a worker process.
+    """
+    try:
+        return reserve_records_adapter.validate_python(items), []
+    except ValidationError as exc:
+        messages: Dict[int, List[str]] = {}
+        for error in exc.errors():
+            index, *loc = error["loc"]
+            field = ".".join(str(part) for part in loc)
+            messages.setdefault(index, []).append(f"{field}: {error['msg']}" if field else error["msg"])
+
+    errors = [{"index": offset + index, "message": "; ".join(msgs)} for index, msgs in sorted(messages.items())]
+    valid = [item for index, item in enumerate(items) if index not in messages]
+    return reserve_records_adapter.validate_python(valid), errors
+
+
+def get_import_job(db: Session, job_id: str) -> Optional[ImportJob]:
+    return db.get(ImportJob, job_id)
+
+
+class ImportJobRunner:
+    """Persistent in-process queue of import jobs with one worker thread"""
+
+    def __init__(self, session_factory: Callable[[Optional[str]], Session], batch_size: int = 500, workers: int = 0):
+        # Called with a campaign (None for the base catalog)
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.workers = workers
+        # (campaign, job id); None stops the worker
+        self._queue: "queue.Queue[Optional[Tuple[Optional[str], str]]]" = queue.Queue()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, db: Session, records: List[Any], campaign: Optional[str] = None) -> ImportJob:
+        """Persist a new job for the given (unvalidated) records and queue it.
+
+        ``db`` must be a session on ``campaign``'s catalog; the job is stored
+        and run there.
+        """
+        job = ImportJob(id=uuid.uuid4().hex, status=QUEUED, payload=records, total=len(records), errors=[])
+        db.add(job)
+        db.commit()
+        self._queue.put((campaign, job.id))
+        return job
+
+    def start(self) -> None:
+        """Start the worker thread and requeue jobs left over from a previous run"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopping.clear()
+        if self.workers > 0:
+            # spawn, not fork: forking a process that runs threads is unsafe
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+        for campaign in [None, *engines.campaigns()]:
+            db = self.session_factory(campaign)
+            try:
+                pending = db.scalars(
+                    select(ImportJob.id).where(ImportJob.status.in_((QUEUED, RUNNING))).order_by(ImportJob.created_at)
+                ).all()
+            finally:
+                db.close()
+            for job_id in pending:
+                self._queue.put((campaign, job_id))
+
+        self._thread = threading.Thread(target=self._run, name="import-jobs", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop after the current batch; an unfinished job resumes on the next start"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+        if self._pool is not None:
+            if sys.version_info >= (3, 9):
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            else:
+                # No cancel_futures before 3.9: batches already queued are
+                # still validated, and their results discarded
+                self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._process(*item)
+            except Exception:
+                traceback.print_exc()
+
+    def _process(self, campaign: Optional[str], job_id: str) -> None:
+        db = self.session_factory(campaign)
+        try:
+            job = db.get(ImportJob, job_id)
+            if job is None or job.status not in (QUEUED, RUNNING):
+                return
+            job.status = RUNNING
+            job.started_at = job.started_at or datetime.utcnow()
+            db.commit()
+
+            try:
+                finished = self._import_batches(db, job)
+            except Exception as exc:
+                db.rollback()
+                self._finish(db, job, FAILED, error=str(exc))
+                raise
+            if finished:
+                self._finish(db, job, SUCCEEDED)
+        finally:
+            db.close()
+
+    def _import_batches(self, db: Session, job: ImportJob) -> bool:
+        """Import the remaining batches; False if interrupted by ``stop``"""
+        for end, records, errors in self._validated_batches(job.payload or [], job.processed):
+            if self._stopping.is_set():
+                return False
+
+            imported = insert_new_reserves(db, records)
+            job.processed = end
+            job.imported += len(imported)
+            job.skipped += len(records) - len(imported)
+            job.invalid += len(errors)
+            if errors and len(job.errors) < MAX_STORED_ERRORS:
+                # Assign a new list so the JSON column is flagged as changed
+                job.errors = (job.errors + errors)[:MAX_STORED_ERRORS]
+            db.commit()
+            writes_committed(db)
+        return True
+
+    def _validated_batches(self, items: List[Any], start: int) -> Iterator[Tuple[int, List[ReserveRecord], List[JobError]]]:
+        """Yield ``(end, records, errors)`` per batch, in order"""
+        batches = [(offset, items[offset:offset + self.batch_size]) for offset in range(start, len(items), self.batch_size)]
+        if self._pool is None:
+            for offset, batch in batches:
+                yield (offset + len(batch), *validate_batch(batch, offset))
+            return
+
+        # Keep a few batches validating ahead of the one being inserted
+        pending = deque()
+        for offset, batch in batches:
+            pending.append((offset + len(batch), self._pool.submit(validate_batch, batch, offset)))
+            if len(pending) > self.workers:
+                end, future = pending.popleft()
+                yield (end, *future.result())
+        while pending:
+            end, future = pending.popleft()
+            yield (end, *future.result())
+
+    @staticmethod
+    def _finish(db: Session, job: ImportJob, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.payload = None
+        job.finished_at = datetime.utcnow()
+        db.commit()
+
+
+import_jobs = ImportJobRunner(open_session, settings.import_job_batch_size, settings.import_job_workers)
@@ -0,0 +1,182 @@
+"""Reserve write service shared by the REST and GraphQL APIs.
+
+Every write is a single ``INSERT ... ON CONFLICT`` / ``UPDATE`` /
+``DELETE`` statement with ``RETURNING``, so existence checks happen in the
+same statement as the write instead of a separate SELECT.
+
+Each write runs in a ``_create``/``_update``/``_delete`` helper that does
+not commit, so it can share a transaction with other writes when write
+batching is enabled (see ``backend/services/batching.py``).
+
+Writes target the session's own database (``main.reserves``). In a campaign
+shard, base reserves are visible to reads but can't be updated or deleted
+(``BaseReserveReadOnlyError``); creating a reserve with a base reserve's id
+overrides it for that campaign.
+"""
+from typing import Callable, Iterable, List, TypeVar
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.database import WRITE_TABLES, SessionLocal, attaches_base_catalog
+from backend.models.reserves import Reserve
+from backend.schemas.reserves import ReservePatch, ReserveRecord
+from backend.services.batching import WriteBatcher
+from backend.services.changes import DELETE, record_changes
+from backend.services.descriptions import render_description
+from backend.singleflight import writes_committed
+
+T = TypeVar("T")
+
+OPTIONAL_FIELDS = ("bonuses", "deployables", "actions", "synergies")
+
+
+class ReserveExistsError(Exception):
+    """Raised when creating a reserve whose id is already taken"""
+
+    def __init__(self, reserve_id: str):
+        super().__init__(f"Reserve with id '{reserve_id}' already exists")
+        self.reserve_id = reserve_id
+
+
+class ReserveNotFoundError(Exception):
+    """Raised when updating or deleting a reserve that does not exist"""
+
+    def __init__(self, reserve_id: str):
+        super().__init__(f"Reserve with id '{reserve_id}' not found")
+        self.reserve_id = reserve_id
+
+
+class BaseReserveReadOnlyError(Exception):
+    """Raised when updating or deleting a base reserve from a campaign"""
+
+    def __init__(self, reserve_id: str):
+        super().__init__(
+            f"Reserve with id '{reserve_id}' belongs to the base catalog; "
+            "base-catalog reserves are read-only in campaigns"
+        )
+        self.reserve_id = reserve_id
+
+
+def _no_row_error(db: Session, reserve_id: str) -> Exception:
+    """Error for an update or delete that matched none of the session's own reserves"""
+    # In a campaign the id may still be visible through the base catalog
+    if attaches_base_catalog(db.get_bind()) and db.query(Reserve.id).filter(Reserve.id == reserve_id).first():
+        return BaseReserveReadOnlyError(reserve_id)
+    return ReserveNotFoundError(reserve_id)
+
+
+def _row_values(record: ReserveRecord) -> dict:
+    """Fill in absent optional fields and the derived description forms"""
+    values = dict(record)
+    for field in OPTIONAL_FIELDS:
+        values.setdefault(field, None)
+    values.update(render_description(values["description"]))
+    return values
+
+
+def _insert_ignoring_existing():
+    return insert(Reserve).on_conflict_do_nothing(index_elements=[Reserve.id]).execution_options(**WRITE_TABLES)
+
+
+def _create(db: Session, record: ReserveRecord) -> Reserve:
+    stmt = _insert_ignoring_existing().values(**_row_values(record)).returning(Reserve)
+    db_reserve = db.scalars(stmt).first()
+    if db_reserve is None:
+        raise ReserveExistsError(record["id"])
+
+    record_changes(db, [db_reserve.id])
+    return db_reserve
+
+
+def _update(db: Session, reserve_id: str, patch: ReservePatch) -> Reserve:
+    values = dict(patch)
+    if "description" in values:
+        values.update(render_description(values["description"]))
+    stmt = (
+        update(Reserve)
+        .where(Reserve.id == reserve_id)
+        .values(**values)
+        .returning(Reserve)
+        .execution_options(populate_existing=True, **WRITE_TABLES)
+    )
+    db_reserve = db.scalars(stmt).first()
+    if db_reserve is None:
+        raise _no_row_error(db, reserve_id)
+
+    record_changes(db, [db_reserve.id])
+    return db_reserve
+
+
+def _delete(db: Session, reserve_id: str) -> None:
+    stmt = delete(Reserve).where(Reserve.id == reserve_id).returning(Reserve.id).execution_options(**WRITE_TABLES)
+    if db.execute(stmt).scalar() is None:
+        raise _no_row_error(db, reserve_id)
+
+    record_changes(db, [reserve_id], op=DELETE)
+
+
+# With write batching enabled the request's own session is not used; the
+# batcher's writer thread runs the write on a session bound to the same
+# database and commits it together with other concurrent writes.
+writes = WriteBatcher(
+    lambda bind: SessionLocal(bind=bind),
+    window=settings.write_batch_window_ms / 1000,
+    max_batch=settings.write_batch_max_size,
+    expected=(ReserveExistsError, ReserveNotFoundError, BaseReserveReadOnlyError),
+    enabled=settings.write_batching,
+)
+
+
+def _write(db: Session, op: Callable[..., T], *args) -> T:
+    """Run a single write and commit it, alone or as part of a group commit"""
+    if writes.enabled:
+        result = writes.submit(db.get_bind(), op, *args)
+    else:
+        try:
+            result = op(db, *args)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    writes_committed(db)
+    return result
+
+
+def create_reserve(db: Session, record: ReserveRecord) -> Reserve:
+    """Insert a new reserve, failing if the id is already taken"""
+    return _write(db, _create, record)
+
+
+def update_reserve(db: Session, reserve_id: str, patch: ReservePatch) -> Reserve:
+    """Apply a partial update to an existing reserve"""
+    return _write(db, _update, reserve_id, patch)
+
+
+def delete_reserve(db: Session, reserve_id: str) -> None:
+    """Delete a reserve and leave a tombstone in the change log"""
+    _write(db, _delete, reserve_id)
+
+
+def insert_new_reserves(db: Session, records: Iterable[ReserveRecord]) -> List[Reserve]:
+    """Insert reserves skipping existing ids, leaving the commit to the caller"""
+    rows = [_row_values(record) for record in records]
+    if not rows:
+        return []
+
+    imported = list(db.scalars(_insert_ignoring_existing().returning(Reserve), rows))
+    record_changes(db, [r.id for r in imported])
+    return imported
+
+
+def import_reserves(db: Session, records: Iterable[ReserveRecord]) -> List[Reserve]:
+    """Bulk insert reserves, silently skipping ids that already exist.
+
+    Returns the reserves that were actually inserted.
+    """
+    imported = insert_new_reserves(db, records)
+    db.commit()
+    writes_committed(db)
+    return imported
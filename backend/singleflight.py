@@ -0,0 +1,104 @@
+"""Request coalescing for identical concurrent reads.
+
+When several callers ask for the same key while a call for it is already
+running, they wait for that call and share its result (or exception)
+instead of repeating the work. Nothing is cached: once the call finishes
+the next caller for the key starts a fresh one.
+
+Callers wait on the event loop, not in the threadpool: only the first
+caller for a key runs its call in a worker thread, so a herd of identical
+reads holds one threadpool token rather than one per request and can't
+starve other requests of worker threads.
+
+Reads are keyed by database and its write generation, which is advanced
+after every committed write. A read that arrives after a write committed
+therefore never joins a read that started before it, so a client always
+reads its own writes.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Set, TypeVar
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from backend.config import settings
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key.
+
+    Calls run in the threadpool. The shared result is a thread-safe future,
+    so callers on different event loops (see ``backend/graphql/executor.py``)
+    can share a call too.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._leaders: Set[asyncio.Task] = set()
+        self._generations: Dict[Hashable, int] = {}
+        self.coalesced = 0
+
+    def generation(self, database: Hashable) -> int:
+        """Number of writes committed to ``database`` so far"""
+        return self._generations.get(database, 0)
+
+    def advance(self, database: Hashable) -> None:
+        """Record a committed write so later reads of ``database`` start afresh"""
+        with self._lock:
+            self._generations[database] = self._generations.get(database, 0) + 1
+
+    async def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run ``fn`` in the threadpool for ``key``, or await the call already in flight"""
+        if not self.enabled:
+            return await run_in_threadpool(fn)
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if leader:
+            # A task of its own, so a leader that is cancelled (e.g. its client
+            # disconnected) still completes the call its followers await
+            task = asyncio.get_running_loop().create_task(self._run(key, fn, call))
+            self._leaders.add(task)
+            task.add_done_callback(self._leaders.discard)
+        return await asyncio.shield(asyncio.wrap_future(call))
+
+    async def _run(self, key: Hashable, fn: Callable[[], T], call: Future) -> None:
+        try:
+            result = await run_in_threadpool(fn)
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            call.set_exception(e)
+        else:
+            with self._lock:
+                del self._calls[key]
+            call.set_result(result)
+
+
+# Shared by the REST and GraphQL read paths
+reads = SingleFlight(enabled=settings.read_coalescing)
+
+
+def read_key(db: Session, key: Hashable) -> Hashable:
+    """Coalescing key for a read on ``db``'s database at its current write generation"""
+    # The URL rather than the engine, which is replaced when a campaign's
+    # shard is evicted and reopened
+    database = db.get_bind().url
+    return (database, reads.generation(database), key)
+
+
+def writes_committed(db: Session) -> None:
+    """Call after committing writes on ``db`` so no later read joins an older one"""
+    reads.advance(db.get_bind().url)
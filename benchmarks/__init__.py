@@ -0,0 +1 @@
+# Benchmarks for the Lancer Reserves API
@@ -0,0 +1,97 @@
+"""Synthetic reserve catalogs for benchmarking.
+
+Catalogs are generated deterministically from the shapes in
+``reserves.json`` so every run (and every machine) benchmarks the same
+data. Seeded SQLite files are cached under ``benchmarks/.data`` because
+the larger catalogs take a while to build.
+"""
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List
+
+from sqlalchemy import create_engine, insert
+
+from backend.database import Base
+from backend.migrations import stamp_latest
+from backend.models.reserves import Reserve, ReserveChange
+from backend.services.descriptions import render_description
+
+ROOT = Path(__file__).resolve().parent.parent
+RESERVES_FILE = ROOT / "reserves.json"
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+
+# Bump when the generated rows or schema change so stale cached catalogs are rebuilt
+CATALOG_VERSION = 4
+SEED_CHUNK_SIZE = 10000
+
+
+def load_templates() -> List[dict]:
+    with open(RESERVES_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def catalog_id(index: int) -> str:
+    """Id of the reserve at ``index`` in every generated catalog"""
+    return f"bench_{index:07d}"
+
+
+def generate_reserves(count: int, start: int = 0, prefix: str = "bench") -> Iterator[dict]:
+    """Yield ``count`` storage records cycling through the reserves.json shapes"""
+    templates = load_templates()
+    for index in range(start, start + count):
+        template = templates[index % len(templates)]
+        record = dict(template)
+        record["id"] = f"{prefix}_{index:07d}"
+        record["name"] = f"{template['name']} #{index}"
+        yield record
+
+
+def catalog_path(size: int) -> Path:
+    return DATA_DIR / f"catalog-v{CATALOG_VERSION}-{size}.db"
+
+
+def build_catalog(size: int) -> Path:
+    """Return a cached SQLite catalog with ``size`` reserves, building it if needed"""
+    path = catalog_path(size)
+    if path.exists():
+        return path
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    partial.unlink(missing_ok=True)
+
+    engine = create_engine(f"sqlite:///{partial}")
+    Base.metadata.create_all(bind=engine)
+    # Built from the current models, so no migration needs to run on copies
+    stamp_latest(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        chunk = []
+        for record in generate_reserves(size):
+            row = {field: record.get(field) for field in ("id", "name", "type", "label", "description", "bonuses", "deployables", "actions", "synergies")}
+            row.update(render_description(row["description"]))
+            row["created_at"] = row["updated_at"] = now
+            chunk.append(row)
+            if len(chunk) >= SEED_CHUNK_SIZE:
+                _insert_chunk(conn, chunk)
+                chunk = []
+        if chunk:
+            _insert_chunk(conn, chunk)
+    engine.dispose()
+
+    partial.rename(path)
+    return path
+
+
+def _insert_chunk(conn, rows: List[dict]) -> None:
+    conn.execute(insert(Reserve), rows)
+    conn.execute(insert(ReserveChange), [{"reserve_id": row["id"], "op": "upsert", "changed_at": row["created_at"]} for row in rows])
+
+
+def working_copy(size: int, destination: Path) -> Path:
+    """Copy the cached catalog to ``destination`` so write benchmarks don't dirty the cache"""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(build_catalog(size), destination)
+    return destination
@@ -0,0 +1,77 @@
+"""Measure cold-start cost: import time and app construction.
+
+Each scenario runs in a fresh interpreter with ``python -X importtime``.
+The report shows the wall time of the scenario (median of ``--repeat``
+runs) and the modules with the largest cumulative import time from one
+run, so slow or unexpectedly eager imports are easy to spot.
+
+Usage:
+    uv run python -m benchmarks.importtime [--top 15] [--repeat 5]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Timed code runs after ``import time; started = time.perf_counter()``
+SCENARIOS = {
+    "seed module": "import backend.seed",
+    "main module": "import backend.main",
+    "full app": "from backend.main import create_app; create_app()",
+    "REST-only app": (
+        "from backend.config import Settings; from backend.main import create_app; "
+        "create_app(Settings(graphql=False, docs=False))"
+    ),
+}
+
+
+def run_scenario(code: str) -> Tuple[float, str]:
+    """Run ``code`` in a fresh interpreter; return its wall time and -X importtime output"""
+    script = f"import time; started = time.perf_counter(); {code}; print(time.perf_counter() - started)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(output: str) -> List[Tuple[int, int, str]]:
+    """Parse ``-X importtime`` lines into ``(self_us, cumulative_us, module)``"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list per scenario")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario for the wall time")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    args = parser.parse_args()
+
+    for name in args.scenarios:
+        code = SCENARIOS[name]
+        runs = [run_scenario(code) for _ in range(args.repeat)]
+        wall = statistics.median(elapsed for elapsed, _ in runs)
+        rows = parse_importtime(runs[0][1])
+
+        print(f"{name}: {wall * 1000:.1f} ms (median of {args.repeat}), {len(rows)} modules imported")
+        print(f"  {'cumulative ms':>13} {'self ms':>9}  module")
+        for self_us, cumulative_us, module in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+            print(f"  {cumulative_us / 1000:>13.1f} {self_us / 1000:>9.1f}  {module}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
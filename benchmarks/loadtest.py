@@ -0,0 +1,211 @@
+"""Drive load against one seeded catalog and report latency per operation.
+
+Normally invoked by ``benchmarks.run``, which prepares the catalog and
+points ``LANCER_RESERVES_DATABASE_URL`` at it before this module (and
+therefore the app) is imported.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from itertools import count
+from typing import Callable, Dict, List, Tuple, Union
+
+import httpx
+
+from benchmarks.catalog import catalog_id, generate_reserves
+
+IMPORT_BATCH_SIZE = 10
+# Ids per multi-get, compared against the same number of single GETs
+MULTI_GET_SIZE = 20
+
+RESERVE_FIELDS = "id name type label description bonuses { id val } actions { name activation detail }"
+
+Request = Tuple[str, str, dict]
+
+GRAPHQL_INPUT_FIELDS = ("id", "name", "type", "label", "description", "bonuses", "deployables", "actions", "synergies")
+
+
+class Context:
+    """Per-run state shared by the request builders"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.rng = random.Random(size)
+        self._import_counter = count()
+        self._create_counter = count()
+
+    def random_id(self) -> str:
+        return catalog_id(self.rng.randrange(self.size))
+
+    def random_ids(self, count: int) -> List[str]:
+        return [self.random_id() for _ in range(count)]
+
+    def new_reserves(self, prefix: str) -> List[dict]:
+        batch = next(self._import_counter)
+        return list(generate_reserves(IMPORT_BATCH_SIZE, start=batch * IMPORT_BATCH_SIZE, prefix=prefix))
+
+    def new_reserve(self, prefix: str) -> dict:
+        return next(generate_reserves(1, start=next(self._create_counter), prefix=prefix))
+
+
+def graphql_reserve_input(record: dict) -> dict:
+    """Shape a storage record as a GraphQL ReserveInput"""
+    data = {field: record[field] for field in GRAPHQL_INPUT_FIELDS if record.get(field) is not None}
+    data["type"] = record["type"].upper()
+    return data
+
+
+def graphql(query: str, variables: dict = None) -> Request:
+    return "POST", "/graphql", {"query": query, "variables": variables or {}}
+
+
+# Each operation builds one request, or a list of requests issued back to
+# back and timed as a single operation.
+OPERATIONS: Dict[str, Callable[[Context], Union[Request, List[Request]]]] = {
+    "list_reserves": lambda ctx: ("GET", "/api/v1/reserves/?type=Mech&limit=100", None),
+    "get_reserve": lambda ctx: ("GET", f"/api/v1/reserves/{ctx.random_id()}", None),
+    "get_reserve_x20": lambda ctx: [("GET", f"/api/v1/reserves/{reserve_id}", None) for reserve_id in ctx.random_ids(MULTI_GET_SIZE)],
+    "batch_get": lambda ctx: ("GET", f"/api/v1/reserves/batch?ids={','.join(ctx.random_ids(MULTI_GET_SIZE))}", None),
+    "random": lambda ctx: ("GET", "/api/v1/reserves/random?count=5", None),
+    "create_reserve": lambda ctx: ("POST", "/api/v1/reserves/", ctx.new_reserve("bench_create")),
+    "import": lambda ctx: ("POST", "/api/v1/reserves/import", ctx.new_reserves("bench_rest")),
+    "graphql_reserves": lambda ctx: graphql(
+        f"query {{ reserves(type: MECH, limit: 100) {{ {RESERVE_FIELDS} }} }}"
+    ),
+    "graphql_reserve": lambda ctx: graphql(
+        f"query Reserve($id: String!) {{ reserve(id: $id) {{ {RESERVE_FIELDS} }} }}",
+        {"id": ctx.random_id()},
+    ),
+    "graphql_import": lambda ctx: graphql(
+        "mutation Import($reserves: [ReserveInput!]!) { importReserves(reserves: $reserves) { id } }",
+        {"reserves": [graphql_reserve_input(r) for r in ctx.new_reserves("bench_gql")]},
+    ),
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+async def run_operation(client: httpx.AsyncClient, ctx: Context, name: str, requests: int, concurrency: int) -> dict:
+    build = OPERATIONS[name]
+    latencies: List[float] = []
+    errors = 0
+    remaining = count()
+
+    async def worker():
+        nonlocal errors
+        while next(remaining) < requests:
+            steps = build(ctx)
+            if isinstance(steps, tuple):
+                steps = [steps]
+            started = time.perf_counter()
+            failed = False
+            for method, url, body in steps:
+                response = await client.request(method, url, json=body)
+                if response.status_code >= 400 or (url == "/graphql" and response.json().get("errors")):
+                    failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "op": name,
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def run_all(client: httpx.AsyncClient, ctx: Context, ops: List[str], requests: int, concurrency: int, warmup: int) -> List[dict]:
+    results = []
+    for name in ops:
+        if warmup:
+            await run_operation(client, ctx, name, warmup, concurrency)
+        results.append(await run_operation(client, ctx, name, requests, concurrency))
+    return results
+
+
+async def run_inprocess(ctx: Context, args) -> List[dict]:
+    from backend.database import init_db
+    from backend.main import app
+
+    init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        return await run_all(client, ctx, args.ops, args.requests, args.concurrency, args.warmup)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_uvicorn(ctx: Context, args) -> List[dict]:
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+        stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not become healthy")
+                await asyncio.sleep(0.1)
+            return await run_all(client, ctx, args.ops, args.requests, args.concurrency, args.warmup)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, required=True, help="Number of reserves in the seeded catalog")
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--ops", nargs="+", choices=sorted(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--output", required=True, help="File to write the JSON results to")
+    args = parser.parse_args()
+
+    ctx = Context(args.size)
+    runner = run_inprocess if args.mode == "inprocess" else run_uvicorn
+    results = asyncio.run(runner(ctx, args))
+    for result in results:
+        result.update(size=args.size, mode=args.mode)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Benchmark suite for the Lancer Reserves API.
+
+Seeds synthetic catalogs, runs every benchmarked REST and GraphQL
+operation against the app in-process (ASGI transport) and/or behind a
+local uvicorn, and writes p50/p95/p99 latency and req/s to a JSON file.
+Pass a previous results file with ``--compare`` to fail on regressions.
+
+Usage:
+    uv run --extra bench python -m benchmarks.run --sizes 1000 100000 1000000
+    uv run --extra bench python -m benchmarks.run --compare benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+from benchmarks.catalog import ROOT, working_copy
+from benchmarks.loadtest import OPERATIONS
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_size(size: int, mode: str, args) -> List[dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        database = working_copy(size, Path(tmp) / "bench.db")
+        output = Path(tmp) / "results.json"
+        env = dict(os.environ, LANCER_RESERVES_DATABASE_URL=f"sqlite:///{database}")
+        subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.loadtest",
+                "--size", str(size),
+                "--mode", mode,
+                "--ops", *args.ops,
+                "--requests", str(args.requests),
+                "--concurrency", str(args.concurrency),
+                "--warmup", str(args.warmup),
+                "--output", str(output),
+            ],
+            cwd=ROOT,
+            env=env,
+            check=True,
+        )
+        with open(output, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def compare(results: List[dict], baseline_file: Path, threshold: float) -> List[str]:
+    """Return a line per operation whose p95 latency or req/s regressed beyond ``threshold`` percent"""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = {(r["size"], r["mode"], r["op"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["size"], result["mode"], result["op"]))
+        if previous is None:
+            continue
+        key = f"{result['op']} (size={result['size']}, {result['mode']})"
+        if previous["p95_ms"] and result["p95_ms"] > previous["p95_ms"] * (1 + threshold / 100):
+            regressions.append(f"{key}: p95 {previous['p95_ms']}ms -> {result['p95_ms']}ms")
+        if previous["rps"] and result["rps"] < previous["rps"] * (1 - threshold / 100):
+            regressions.append(f"{key}: {previous['rps']} req/s -> {result['rps']} req/s")
+    return regressions
+
+
+def print_table(results: List[dict]) -> None:
+    print(f"{'size':>9} {'mode':<10} {'op':<18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>7}")
+    for r in results:
+        print(f"{r['size']:>9} {r['mode']:<10} {r['op']:<18} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['rps']:>9.1f} {r['errors']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], help="Catalog sizes to seed (e.g. 1000 100000 1000000)")
+    parser.add_argument("--modes", nargs="+", choices=("inprocess", "uvicorn"), default=["inprocess", "uvicorn"])
+    parser.add_argument("--ops", nargs="+", choices=sorted(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per operation")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients per operation")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per operation")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="Previous results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed regression in percent (default: 20)")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        for mode in args.modes:
+            results.extend(run_size(size, mode, args))
+
+    started = datetime.now(timezone.utc)
+    output = args.output or RESULTS_DIR / f"{started.strftime('%Y%m%dT%H%M%SZ')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "meta": {
+                    "timestamp": started.isoformat(),
+                    "revision": git_revision(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "requests": args.requests,
+                    "concurrency": args.concurrency,
+                },
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+    print_table(results)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold}%:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold}% against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Micro-benchmark of per-reserve validation overhead on the write path.
+
+Compares the model-based path the write endpoints used to take (validate
+into ``ReserveCreate`` then ``model_dump`` every nested list) against
+validating straight into storage records, and against the trusted path
+used for the bundled ``reserves.json``.
+
+Usage:
+    uv run python -m benchmarks.write_overhead [--rounds 200]
+"""
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from backend.schemas.reserves import ReserveCreate, load_reserve_records, reserve_record_adapter
+
+RESERVES_FILE = Path(__file__).resolve().parent.parent / "reserves.json"
+
+
+def model_path(payload):
+    """Previous write path: build nested models, then dump them back to dicts"""
+    reserve = ReserveCreate.model_validate(payload)
+    return dict(
+        id=reserve.id,
+        name=reserve.name,
+        type=reserve.type.value,
+        label=reserve.label,
+        description=reserve.description,
+        bonuses=[b.model_dump() for b in reserve.bonuses] if reserve.bonuses else None,
+        deployables=[d.model_dump() for d in reserve.deployables] if reserve.deployables else None,
+        actions=[a.model_dump() for a in reserve.actions] if reserve.actions else None,
+        synergies=[s.model_dump() for s in reserve.synergies] if reserve.synergies else None,
+    )
+
+
+def record_path(payload):
+    """Current write path: validate directly into the storage shape"""
+    return reserve_record_adapter.validate_python(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200, help="Passes over reserves.json per measurement")
+    args = parser.parse_args()
+
+    with open(RESERVES_FILE, "r", encoding="utf-8") as f:
+        payloads = json.load(f)
+
+    def run(fn):
+        return lambda: [fn(p) for p in payloads]
+
+    cases = {
+        "model_validate + model_dump": run(model_path),
+        "TypeAdapter record": run(record_path),
+        "TypeAdapter bulk list": lambda: load_reserve_records(payloads),
+        "trusted (no validation)": lambda: load_reserve_records(payloads, trusted=True),
+    }
+
+    per_reserve = {}
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=args.rounds, repeat=5))
+        per_reserve[name] = best / (args.rounds * len(payloads)) * 1e6
+
+    baseline = per_reserve["model_validate + model_dump"]
+    print(f"{len(payloads)} reserves x {args.rounds} rounds (best of 5)")
+    for name, usec in per_reserve.items():
+        print(f"  {name:<30} {usec:8.2f} us/reserve  ({baseline / usec:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
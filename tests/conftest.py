@@ -0,0 +1,47 @@
+"""Shared fixtures.
+
+Settings are read when ``backend`` is first imported, so the test database
+and campaign directory are pointed at a temporary directory here, before
+any test module imports the app.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+TEST_DIR = Path(tempfile.mkdtemp(prefix="lancer-reserves-tests-"))
+DATABASE = TEST_DIR / "lancer_reserves.db"
+os.environ["LANCER_RESERVES_DATABASE_URL"] = f"sqlite:///{DATABASE}"
+os.environ["LANCER_RESERVES_CAMPAIGNS_DIR"] = str(TEST_DIR / "campaigns")
+
+# Synthetic catalog size; large enough that a full scan is never free
+CATALOG_SIZE = 2000
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Base catalog seeded with a synthetic catalog (see benchmarks/catalog.py)"""
+    from backend.database import engine, init_db
+    from benchmarks.catalog import working_copy
+
+    working_copy(CATALOG_SIZE, DATABASE)
+    init_db()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def app(database):
+    from backend.main import create_app
+
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+
+    # Not entered as a context manager: the lifespan (seeding, job worker)
+    # is not needed against the prepared catalog
+    return TestClient(app)
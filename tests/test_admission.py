@@ -0,0 +1,33 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from backend.admission import AdmissionMiddleware, build_lanes
+from backend.config import settings
+
+
+@pytest.fixture
+def lanes_client():
+    """Client for an app that reports which lane admitted each request and the body it read"""
+    lanes = build_lanes(settings.model_copy(update={"admission_bulk_limit": 1, "admission_graphql_limit": 8}))
+
+    async def app(scope, receive, send):
+        body = await Request(scope, receive).body()
+        active = [name for name, lane in lanes.items() if lane.active]
+        await JSONResponse({"lanes": active, "body": body.decode()})(scope, receive, send)
+
+    return TestClient(AdmissionMiddleware(app, lanes))
+
+
+def test_graphql_imports_use_the_bulk_lane(lanes_client):
+    query = 'mutation { startImportJob(reserves: []) { id } }'
+    response = lanes_client.post("/graphql", json={"query": query})
+    assert response.json()["lanes"] == ["bulk"]
+    # The body read for classification still reaches the app
+    assert query in response.json()["body"]
+
+
+def test_other_graphql_requests_use_the_graphql_lane(lanes_client):
+    assert lanes_client.post("/graphql", json={"query": "{ reserves { id } }"}).json()["lanes"] == ["graphql"]
+    assert lanes_client.get("/graphql", params={"query": "{ reserves { id } }"}).json()["lanes"] == ["graphql"]
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from backend.config import settings
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_create_app_applies_service_settings(database):
+    from backend.main import create_app
+    from backend.services.jobs import import_jobs
+    from backend.services.reserves import writes
+    from backend.singleflight import reads
+
+    config = settings.model_copy(
+        update={"read_coalescing": False, "write_batching": True, "write_batch_max_size": 8, "import_job_batch_size": 50}
+    )
+    try:
+        create_app(config)
+        assert not reads.enabled
+        assert writes.enabled and writes.max_batch == 8
+        assert import_jobs.batch_size == 50
+    finally:
+        create_app(settings)
+    assert reads.enabled == settings.read_coalescing
+    assert writes.enabled == settings.write_batching
+
+
+def test_create_app_rejects_other_database_settings(database):
+    from backend.main import create_app
+
+    with pytest.raises(ValueError, match="database_url"):
+        create_app(settings.model_copy(update={"database_url": "sqlite:///other.db"}))
+
+
+def test_schema_follows_instrumentation_setting(database):
+    from backend.main import get_schema
+
+    plain = get_schema(settings.model_copy(update={"instrumentation": False}))
+    instrumented = get_schema(settings.model_copy(update={"instrumentation": True}))
+    assert plain is not instrumented
+    assert get_schema(settings.model_copy(update={"instrumentation": True})) is instrumented
+
+
+def test_rest_only_app_with_instrumentation_does_not_import_strawberry():
+    # A fresh interpreter, since this one has already built the GraphQL app
+    code = (
+        "import sys\n"
+        "from backend.config import settings\n"
+        "from backend.main import create_app\n"
+        "create_app(settings.model_copy(update={'graphql': False, 'instrumentation': True}))\n"
+        "assert not [m for m in sys.modules if m.split('.')[0] == 'strawberry'], 'strawberry imported'\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT)
@@ -0,0 +1,55 @@
+import threading
+
+from backend.database import SessionLocal
+from backend.services.batching import WriteBatcher
+from backend.services.reserves import ReserveNotFoundError, _create, _update
+
+
+def test_writes_to_one_row_in_a_batch_each_return_their_own_result(database):
+    db = SessionLocal()
+    try:
+        _create(db, {"id": "batch_snapshot", "name": "N0", "type": "Mech", "label": "Gear", "description": "d"})
+        db.commit()
+    finally:
+        db.close()
+
+    # A long window and room for exactly two writes puts both in one batch
+    batcher = WriteBatcher(lambda bind: SessionLocal(bind=bind), window=5, max_batch=2, expected=(ReserveNotFoundError,))
+    results = {}
+
+    def update(name):
+        results[name] = batcher.submit(database, _update, "batch_snapshot", {"name": name}).name
+
+    threads = [threading.Thread(target=update, args=(name,)) for name in ("N1", "N2")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert batcher.batches == 1
+    assert results == {"N1": "N1", "N2": "N2"}
+
+
+def test_failed_write_does_not_fail_the_batch(database):
+    batcher = WriteBatcher(lambda bind: SessionLocal(bind=bind), window=5, max_batch=2, expected=(ReserveNotFoundError,))
+    outcomes = {}
+
+    def write(key, fn, *args):
+        try:
+            outcomes[key] = batcher.submit(database, fn, *args).id
+        except ReserveNotFoundError as exc:
+            outcomes[key] = exc
+
+    record = {"id": "batch_ok", "name": "ok", "type": "Bonus", "label": "Bonus", "description": "d"}
+    threads = [
+        threading.Thread(target=write, args=("create", _create, record)),
+        threading.Thread(target=write, args=("missing", _update, "batch_missing", {"name": "x"})),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert batcher.batches == 1
+    assert outcomes["create"] == "batch_ok"
+    assert isinstance(outcomes["missing"], ReserveNotFoundError)
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from backend.database import BASE_SCHEMA, engines
+
+
+def test_base_catalog_is_attached_read_only(database):
+    with engines.get("attached").connect() as conn:
+        files = {name: file for _, name, file in conn.exec_driver_sql("PRAGMA database_list")}
+        assert Path(files[BASE_SCHEMA]) == Path(database.url.database).resolve()
+
+        with pytest.raises(OperationalError, match="readonly"):
+            conn.exec_driver_sql(f"DELETE FROM {BASE_SCHEMA}.reserves")
+
+
+def test_base_reserves_are_read_only_in_campaigns(client):
+    base = client.get("/api/v1/reserves/", params={"limit": 1}).json()[0]
+    path = f"/campaigns/readonly/api/v1/reserves/{base['id']}"
+
+    assert client.get(path).status_code == 200
+    for response in (client.put(path, json={"name": "Changed"}), client.delete(path)):
+        assert response.status_code == 409
+        assert "read-only in campaigns" in response.json()["detail"]
+
+    assert client.get(f"/api/v1/reserves/{base['id']}").json()["name"] == base["name"]
+    assert client.put("/campaigns/readonly/api/v1/reserves/no_such_reserve", json={"name": "x"}).status_code == 404
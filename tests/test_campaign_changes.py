@@ -0,0 +1,49 @@
+def base_reserve(client):
+    return client.get("/api/v1/reserves/", params={"limit": 1}).json()[0]
+
+
+def sync(client, campaign, since=0):
+    """Follow a campaign's change feed to the end, returning the mirrored catalog and token"""
+    mirror, has_more = {}, True
+    while has_more:
+        page = client.get(f"/campaigns/{campaign}/api/v1/reserves/changes", params={"since": since, "limit": 500}).json()
+        mirror.update((reserve["id"], reserve) for reserve in page["upserts"])
+        for reserve_id in page["deleted"]:
+            mirror.pop(reserve_id, None)
+        since, has_more = page["token"], page["has_more"]
+    return mirror, since
+
+
+def test_full_sync_includes_base_reserves(client):
+    created = client.post(
+        "/campaigns/mirror/api/v1/reserves/",
+        json={"id": "mirror_homebrew", "name": "Homebrew", "type": "Mech", "label": "Gear", "description": "d"},
+    )
+    assert created.status_code == 201
+
+    mirror, _ = sync(client, "mirror")
+
+    visible, page = [], [None]
+    while page:
+        page = client.get("/campaigns/mirror/api/v1/reserves/", params={"skip": len(visible), "limit": 1000}).json()
+        visible += page
+    assert "mirror_homebrew" in mirror
+    assert base_reserve(client)["id"] in mirror
+    assert sorted(mirror) == sorted(reserve["id"] for reserve in visible)
+
+
+def test_deleting_an_override_syncs_the_base_reserve(client):
+    base = base_reserve(client)
+    campaign = "override"
+    _, token = sync(client, campaign)
+
+    override = {**base, "name": "Campaign override"}
+    assert client.post(f"/campaigns/{campaign}/api/v1/reserves/", json=override).status_code == 201
+    mirror, token = sync(client, campaign, token)
+    assert mirror[base["id"]]["name"] == "Campaign override"
+
+    assert client.delete(f"/campaigns/{campaign}/api/v1/reserves/{base['id']}").status_code == 204
+    mirror, _ = sync(client, campaign, token)
+
+    assert mirror[base["id"]]["name"] == base["name"]
+    assert client.get(f"/campaigns/{campaign}/api/v1/reserves/{base['id']}").json()["name"] == base["name"]
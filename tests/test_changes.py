@@ -0,0 +1,19 @@
+from sqlalchemy import event
+
+from backend.services.changes import IN_CHUNK
+
+
+def test_large_change_page_stays_under_the_parameter_limit(client, database):
+    largest = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        largest.append(len(parameters))
+
+    event.listen(database, "before_cursor_execute", capture)
+    try:
+        page = client.get("/api/v1/reserves/changes", params={"since": 0, "limit": 2 * IN_CHUNK + 1}).json()
+    finally:
+        event.remove(database, "before_cursor_execute", capture)
+
+    assert len(page["upserts"]) + len(page["deleted"]) > IN_CHUNK
+    assert max(largest) <= IN_CHUNK
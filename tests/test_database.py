@@ -0,0 +1,9 @@
+import pytest
+
+from backend.database import check_sqlite_version
+
+
+def test_old_sqlite_is_rejected():
+    with pytest.raises(RuntimeError, match="SQLite 3.35.0 or newer is required"):
+        check_sqlite_version((3, 31, 1))
+    check_sqlite_version((3, 35, 0))
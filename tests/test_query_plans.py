@@ -0,0 +1,138 @@
+"""Every REST and GraphQL read query must be served by an index.
+
+Each request is sent in-process, the SELECTs it issues are captured, and
+their ``EXPLAIN QUERY PLAN`` is checked. A table scan that is not narrowed
+by an index search, or sorting such a scan with a temporary B-tree for
+ORDER BY, fails the test. Sorting the rows an index search already
+narrowed down (e.g. a label prefix range) is allowed.
+
+Every ``SCAN <table>`` step is checked on its own: searching one table
+does not excuse scanning another in the same statement. Queries that read
+a whole table by design are listed in ``FULL_SCANS`` with that table and
+the reason; a scan anywhere else is a regression.
+"""
+from typing import Collection
+
+import pytest
+from sqlalchemy import event
+
+from benchmarks.catalog import catalog_id
+
+RESERVE_FIELDS = "id name type label"
+
+REST_REQUESTS = [
+    "/api/v1/reserves/",
+    "/api/v1/reserves/?skip=50&limit=10",
+    "/api/v1/reserves/?type=Mech",
+    "/api/v1/reserves/?label=gear",
+    "/api/v1/reserves/?type=Mech&label=gear",
+    "/api/v1/reserves/?label_prefix=res",
+    "/api/v1/reserves/?type=Tactical&label_prefix=res",
+    "/api/v1/reserves/?type=Mech&fields=id,name,type,label",
+    "/api/v1/reserves/type/Bonus",
+    "/api/v1/reserves/random?count=5",
+    "/api/v1/reserves/random?count=5&type=Mech",
+    f"/api/v1/reserves/{catalog_id(7)}",
+    f"/api/v1/reserves/batch?ids={catalog_id(1)},{catalog_id(2)},missing",
+    "/api/v1/reserves/changes?since=100&limit=50",
+]
+
+GRAPHQL_QUERIES = [
+    f"{{ reserves {{ {RESERVE_FIELDS} }} }}",
+    f"{{ reserves(type: MECH, skip: 5, limit: 10) {{ {RESERVE_FIELDS} }} }}",
+    f'{{ reserves(labelPrefix: "res") {{ {RESERVE_FIELDS} }} }}',
+    f'{{ reserves(type: TACTICAL, labelPrefix: "res") {{ {RESERVE_FIELDS} }} }}',
+    f'{{ reserve(id: "{catalog_id(7)}") {{ {RESERVE_FIELDS} }} }}',
+    f'{{ reservesByLabel(label: "gear") {{ {RESERVE_FIELDS} }} }}',
+    f"{{ randomReserves(count: 5) {{ {RESERVE_FIELDS} }} }}",
+    f"{{ randomReserves(count: 5, type: MECH) {{ {RESERVE_FIELDS} }} }}",
+    "{ reserveChanges(since: 100, limit: 50) { token upserts { id } deleted } }",
+]
+
+# Unfiltered pages walk the primary key in order and stop after LIMIT rows
+PAGE_SCAN = "unfiltered page, primary key walk bounded by LIMIT"
+# lower(label) LIKE '%x%' can't use any index
+SUBSTRING_SCAN = "label substring match"
+
+SAMPLE_SCAN = "samples from every id"
+
+# Query -> (table it may scan, reason)
+FULL_SCANS = {
+    "/api/v1/reserves/": ("reserves", PAGE_SCAN),
+    "/api/v1/reserves/?skip=50&limit=10": ("reserves", PAGE_SCAN),
+    "/api/v1/reserves/?label=gear": ("reserves", SUBSTRING_SCAN),
+    "/api/v1/reserves/random?count=5": ("reserves", SAMPLE_SCAN),
+    GRAPHQL_QUERIES[0]: ("reserves", PAGE_SCAN),
+    GRAPHQL_QUERIES[5]: ("reserves", SUBSTRING_SCAN),
+    GRAPHQL_QUERIES[6]: ("reserves", SAMPLE_SCAN),
+}
+
+
+def plan_problems(plan_rows, allow_scan: Collection[str] = ()) -> list:
+    """Return the plan steps that read or sort a whole table without an index search.
+
+    ``allow_scan`` names the tables this statement may scan.
+    """
+    details = [row[-1] for row in plan_rows]
+    scans = [detail for detail in details if detail.startswith("SCAN ")]
+    problems = [detail for detail in scans if detail.split()[1] not in allow_scan]
+    if scans:
+        # Sorting scanned rows sorts a whole table
+        problems += [detail for detail in details if detail.startswith("USE TEMP B-TREE")]
+    return problems
+
+
+@pytest.fixture
+def captured(database):
+    """SELECT statements issued while the test runs"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(database, "before_cursor_execute", capture)
+    yield statements
+    event.remove(database, "before_cursor_execute", capture)
+
+
+def assert_uses_indexes(database, label: str, statements) -> None:
+    assert statements, f"{label} issued no SELECT"
+    allow_scan = {FULL_SCANS[label][0]} if label in FULL_SCANS else set()
+    for statement, parameters in statements:
+        with database.connect() as conn:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        problems = plan_problems(plan, allow_scan)
+        assert not problems, f"{label}: {problems}\n{statement}"
+
+
+@pytest.mark.parametrize("url", REST_REQUESTS)
+def test_rest_read_uses_index(client, database, captured, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.text
+    assert_uses_indexes(database, url, captured)
+
+
+@pytest.mark.parametrize("query", GRAPHQL_QUERIES)
+def test_graphql_read_uses_index(client, database, captured, query):
+    response = client.post("/graphql", json={"query": query})
+    assert response.status_code == 200, response.text
+    assert not response.json().get("errors"), response.text
+    assert_uses_indexes(database, query, captured)
+
+
+def test_full_scan_is_detected():
+    plan = [(2, 0, 0, "SCAN reserves USING INDEX sqlite_autoindex_reserves_1")]
+    assert plan_problems(plan) == [plan[0][-1]]
+    assert plan_problems(plan, allow_scan={"reserves"}) == []
+    assert plan_problems([(5, 0, 0, "SEARCH reserves USING INDEX ix_reserves_type_id (type=?)")]) == []
+
+
+def test_scan_next_to_a_search_is_detected():
+    plan = [
+        (3, 0, 0, "SEARCH reserves USING INDEX sqlite_autoindex_reserves_1 (id=?)"),
+        (7, 0, 0, "SCAN reserve_changes"),
+    ]
+    assert plan_problems(plan) == ["SCAN reserve_changes"]
+    assert plan_problems(plan, allow_scan={"reserves"}) == ["SCAN reserve_changes"]
+    assert plan_problems(plan, allow_scan={"reserve_changes"}) == []
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+import anyio.to_thread
+from starlette.concurrency import run_in_threadpool
+
+from backend.database import SessionLocal
+from backend.singleflight import read_key, reads, writes_committed
+
+
+def blocking_read(result, started: threading.Event, release: threading.Event, calls: list):
+    def read():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return result
+
+    return read
+
+
+async def wait_for(event: threading.Event):
+    assert await run_in_threadpool(event.wait, 5)
+
+
+def test_read_after_write_does_not_join_older_read(database):
+    db = SessionLocal()
+    started, release = threading.Event(), threading.Event()
+
+    async def scenario():
+        leader = asyncio.ensure_future(reads.do(read_key(db, "ryw"), blocking_read("before write", started, release, [])))
+        try:
+            await wait_for(started)
+            writes_committed(db)
+            assert await reads.do(read_key(db, "ryw"), lambda: "after write") == "after write"
+        finally:
+            release.set()
+        assert await leader == "before write"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        db.close()
+
+
+def test_concurrent_reads_share_one_call(database):
+    db = SessionLocal()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    async def scenario():
+        read = blocking_read("shared", started, release, calls)
+        leader = asyncio.ensure_future(reads.do(read_key(db, "shared"), read))
+        try:
+            await wait_for(started)
+            follower = asyncio.ensure_future(reads.do(read_key(db, "shared"), read))
+            await asyncio.sleep(0.05)
+        finally:
+            release.set()
+        return await asyncio.gather(leader, follower)
+
+    try:
+        assert asyncio.run(scenario()) == ["shared", "shared"]
+    finally:
+        db.close()
+    assert len(calls) == 1
+
+
+def test_waiting_reads_do_not_hold_worker_threads(database):
+    db = SessionLocal()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    async def scenario():
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = 4
+        read = blocking_read("herd", started, release, calls)
+        herd = [asyncio.ensure_future(reads.do(read_key(db, "herd"), read)) for _ in range(limiter.total_tokens * 4)]
+        try:
+            await asyncio.sleep(0.05)
+            # With every duplicate in a worker thread this would wait for a token
+            assert await asyncio.wait_for(run_in_threadpool(lambda: "other"), 5) == "other"
+        finally:
+            release.set()
+        return await asyncio.gather(*herd)
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        db.close()
+    assert set(results) == {"herd"}
+    assert len(calls) == 1